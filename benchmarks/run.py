@@ -0,0 +1,175 @@
+"""Бенчмарк этапов планировщика на синтетических выгрузках.
+
+Работает без сети: генерация текстов AI заменена заглушкой с тем же
+интерфейсом. Результаты сравниваются с сохраненной базовой линией,
+при замедлении этапа скрипт завершается с кодом 1.
+
+Запуск из корня проекта:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1000 1000000 5000000 --scenarios top_k
+    python -m benchmarks.run --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+
+from config import VERSION
+from modules.engine import PlannerConfig, plan, write_schedule
+from modules.timing import StageTimer
+from benchmarks.synthetic import dataset_path
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baselines.json')
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# Допустимое замедление относительно базовой линии
+DEFAULT_TOLERANCE = 1.5
+# Разница меньше этой считается шумом измерений (секунды)
+MIN_DELTA = 0.05
+
+SCENARIOS = {
+    # Типичный запуск: лучшие 1000 пинов из выгрузки
+    'top_k': dict(post_limit=1000, min_saves=50),
+    'top_k_streaming': dict(post_limit=1000, min_saves=50, streaming=True),
+    # Все прошедшие фильтр строки - нагрузка на тексты, дубликаты и расписание
+    'full': dict(min_saves=50),
+}
+
+STUB_BATCH_SIZE = 10
+
+
+def stub_text_generator(base_text, count, progress_callback, number_start):
+    """Заглушка AI: пакеты по 10 текстов с прогрессом, как generate_unique_texts"""
+    texts = []
+    for start in range(0, count, STUB_BATCH_SIZE):
+        batch = min(STUB_BATCH_SIZE, count - start)
+        texts.extend(f"{base_text} идея {number_start + start + i}" for i in range(batch))
+        if progress_callback:
+            progress_callback(len(texts), count)
+    return texts
+
+
+def run_once(path, scenario, output_dir):
+    """Один прогон сценария; возвращает секунды по этапам"""
+    config = PlannerConfig(
+        start_date="01.01.2026", seed=1, base_text="Идеи для дома", base_link="https://example.com/p",
+        **SCENARIOS[scenario]
+    )
+    timer = StageTimer()
+    df_output = plan(path, config, text_generator=stub_text_generator, timer=timer)
+    with timer.stage('write', rows=len(df_output)):
+        write_schedule(df_output, os.path.join(output_dir, 'schedule.csv'))
+
+    seconds = {name: entry['seconds'] for name, entry in timer.stages.items()}
+    seconds['total'] = timer.total
+    return seconds
+
+
+def run_benchmarks(sizes, scenarios, repeat, data_dir):
+    """Лучшее время каждого этапа из repeat прогонов для всех размеров и сценариев"""
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for rows in sizes:
+            print(f"Подготовка данных: {rows} строк...", flush=True)
+            path = dataset_path(rows, data_dir)
+            for scenario in scenarios:
+                best = {}
+                for _ in range(repeat):
+                    for stage, seconds in run_once(path, scenario, output_dir).items():
+                        best[stage] = min(seconds, best.get(stage, seconds))
+                key = f"{rows}/{scenario}"
+                results[key] = {stage: round(seconds, 4) for stage, seconds in best.items()}
+                print(f"  {key}: {best['total']:.3f} с", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Печатает таблицу сравнения и возвращает список регрессий"""
+    regressions = []
+    for key, stages in results.items():
+        base_stages = baseline.get(key)
+        if base_stages is None:
+            print(f"\n{key}: нет базовой линии")
+            continue
+        print(f"\n{key}")
+        for stage, seconds in stages.items():
+            base = base_stages.get(stage)
+            if base is None:
+                print(f"  {stage:<10} {seconds:>9.3f} с   (новый этап)")
+                continue
+            ratio = seconds / base if base > 0 else float('inf')
+            regressed = seconds > base * tolerance and seconds - base > MIN_DELTA
+            mark = "  <-- РЕГРЕССИЯ" if regressed else ""
+            print(f"  {stage:<10} {seconds:>9.3f} с   база {base:>9.3f} с   x{ratio:.2f}{mark}")
+            if regressed:
+                regressions.append(f"{key} {stage}: {seconds:.3f} с против {base:.3f} с (x{ratio:.2f})")
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {'results': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, baseline, results):
+    """Обновляет базовую линию, сохраняя результаты других размеров"""
+    baseline['version'] = VERSION
+    baseline['python'] = platform.python_version()
+    baseline['machine'] = f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPU"
+    baseline['results'] = {**baseline.get('results', {}), **results}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Бенчмарк этапов планировщика на синтетических выгрузках"
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Размеры выгрузок в строках (до 5000000)")
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=3, help="Число прогонов, берется лучшее время")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Допустимое замедление относительно базовой линии")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Файл базовой линии")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Каталог для синтетических выгрузок")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Записать результаты как новую базовую линию")
+    parser.add_argument('--output', help="Сохранить результаты прогона в JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_benchmarks(args.sizes, args.scenarios, args.repeat, args.data_dir)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION, 'results': results}, f, ensure_ascii=False, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        save_baseline(args.baseline, baseline, results)
+        print(f"\nБазовая линия обновлена: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline.get('results', {}), args.tolerance)
+    if regressions:
+        print("\nРЕГРЕССИЯ ПРОИЗВОДИТЕЛЬНОСТИ:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    print("\nРегрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Доли форматов дат в синтетической выгрузке (как в реальных склейках выгрузок)
+DATE_FORMAT_MIX = [
+    ('%Y-%m-%d', 0.55),
+    ('%d.%m.%Y', 0.25),
+    ('%d/%m/%Y', 0.10),
+    ('%d %b %Y', 0.05),
+    ('%Y-%m-%dT%H:%M:%S', 0.05),
+]
+
+PINIMG_SIZES = np.array(['236x', '564x', '736x', 'originals'])
+TITLE_WORDS = np.array([
+    'Идеи', 'декора', 'для', 'дома', 'осень', 'рецепт', 'образ', 'стиль',
+    'минимализм', 'кухня', 'сад', 'подарок', 'вдохновение', 'маникюр', 'прическа'
+])
+
+DUPLICATE_SHARE = 0.02
+MAX_AGE_DAYS = 1500
+
+
+def generate_export(rows, seed=0, today=None):
+    """Синтетическая выгрузка Pinterest с реалистичными распределениями.
+
+    saves - логнормальное распределение с длинным хвостом (вирусные
+    пины), возраст пинов - экспоненциальный (свежих больше), даты
+    записаны смесью форматов, около 2% строк - повторы изображений
+    в другом размере.
+    """
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(today or '2026-01-01')
+
+    image_ids = rng.integers(0, 2 ** 63, size=rows, dtype=np.int64)
+    repeats = rng.random(rows) < DUPLICATE_SHARE
+    image_ids[repeats] = image_ids[rng.integers(0, rows, size=repeats.sum())]
+    hex_ids = pd.Series(image_ids).map('{:016x}'.format)
+    sizes = pd.Series(PINIMG_SIZES[rng.integers(0, len(PINIMG_SIZES), size=rows)])
+    urls = (
+        'https://i.pinimg.com/' + sizes + '/' + hex_ids.str[:2] + '/' + hex_ids.str[2:4]
+        + '/' + hex_ids.str[4:6] + '/' + hex_ids + '.jpg'
+    )
+
+    saves = np.floor(rng.lognormal(mean=3.0, sigma=2.0, size=rows)).astype(np.int64)
+
+    ages = np.minimum(rng.exponential(scale=300, size=rows), MAX_AGE_DAYS).astype(np.int64)
+    unique_ages, codes = np.unique(ages, return_inverse=True)
+    days = today - pd.to_timedelta(unique_ages, unit='D')
+    formats, weights = zip(*DATE_FORMAT_MIX)
+    format_codes = rng.choice(len(formats), size=rows, p=weights)
+    # Строки дат формируются для уникальных дней и раскладываются по индексам
+    labels = np.array([days.strftime(fmt).to_numpy(dtype=object) for fmt in formats])
+    created = labels[format_codes, codes]
+
+    titles = (
+        pd.Series(TITLE_WORDS[rng.integers(0, len(TITLE_WORDS), size=rows)]) + ' '
+        + pd.Series(TITLE_WORDS[rng.integers(0, len(TITLE_WORDS), size=rows)])
+    )
+
+    return pd.DataFrame({
+        'title': titles,
+        'image url': urls,
+        'pin url': 'https://www.pinterest.com/pin/' + hex_ids,
+        'saves': saves,
+        'created date': created,
+    })
+
+
+def dataset_path(rows, data_dir, seed=0):
+    """Путь к CSV синтетической выгрузки; файл создается при первом обращении"""
+    path = os.path.join(data_dir, f"synthetic_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        tmp_path = path + '.tmp'
+        generate_export(rows, seed).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return path
@@ -15,6 +15,8 @@ ALLOWED_FILE = "allowed_emails.txt"
 LOG_FILE = "error_logs.json"
 OPENAI_KEYS_FILE = "openai_keys.json"
 OPENROUTER_KEYS_FILE = "openrouter_keys.json"
+POSTED_INDEX_FILE = "posted_images.npy"
+TIMING_LOG_FILE = "planner_timings.jsonl"
 
 # Стандартные значения
 DEFAULT_DATE_FORMAT = "%d.%m.%Y"
@@ -22,4 +24,38 @@ DEFAULT_TIME_FORMAT = "%H:%M"
 DEFAULT_MIN_INTERVAL = 30
 DEFAULT_MAX_INTERVAL = 50
 DEFAULT_POST_LIMIT = 1000
-DEFAULT_MIN_SAVES = 200
\ No newline at end of file
+DEFAULT_MIN_SAVES = 200
+
+# Очередь заданий: сколько заданий выполняется одновременно
+MAX_PARALLEL_JOBS = 2
+
+# Кэш конвертированных Excel-файлов
+INPUT_CACHE_DIR = ".pinplan_cache"
+INPUT_CACHE_MAX_MB = 500
+
+# Параллельная генерация текстов AI: запросов одновременно и лимиты провайдера
+# (0 - без ограничения). Бесплатные модели OpenRouter принимают 20 запросов в минуту
+AI_CONCURRENCY = 4
+AI_REQUESTS_PER_MINUTE = 20
+AI_TOKENS_PER_MINUTE = 0
+# Лимиты OpenAI по умолчанию (первый платный уровень)
+CHATGPT_REQUESTS_PER_MINUTE = 500
+CHATGPT_TOKENS_PER_MINUTE = 60000
+
+# Пул API-ключей: пауза ключа после ошибки лимита (если провайдер не прислал
+# Retry-After) и сколько ждать, когда на паузе все ключи
+KEY_COOLDOWN_SECONDS = 60
+KEY_MAX_WAIT_SECONDS = 120
+
+# Размеры пакетов AI, подобранные по ответам моделей, и верхняя граница пакета
+AI_BATCH_SIZES_FILE = "ai_batch_sizes.json"
+AI_BATCH_MAX_SIZE = 50
+
+# Кэш текстов AI: повторные темы берутся из него без обращения к API
+AI_CACHE_FILE = "ai_texts_cache.sqlite3"
+AI_CACHE_TTL_DAYS = 30
+AI_CACHE_MAX_TEXTS = 100000
+
+# Контрольные точки генерации текстов AI
+CHECKPOINT_DIR = ".pinplan_checkpoints"
+CHECKPOINT_MAX_AGE_DAYS = 14
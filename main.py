@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 import tkinter as tk
 
 # Добавляем пути для корректного импорта модулей
@@ -8,6 +9,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from ui.app_ui import PinterestPlannerApp
 
 if __name__ == "__main__":
+    # Нужно для пула процессов очереди заданий в собранном exe
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = PinterestPlannerApp(root)
 
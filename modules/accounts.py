@@ -0,0 +1,133 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import Optional
+
+import pandas as pd
+
+from modules.engine import (
+    PlannerConfig, load_ranked, build_schedule, format_schedule, schedule_timeline, write_schedule
+)
+from modules.timeline import make_rng
+
+# Поля профиля, которые переопределяют общую конфигурацию
+ACCOUNT_OVERRIDES = ['base_text', 'base_link', 'link_template', 'text_template', 'min_interval', 'max_interval']
+
+
+@dataclass
+class AccountProfile:
+    """Настройки одного аккаунта Pinterest"""
+    name: str
+    base_text: Optional[str] = None
+    base_link: Optional[str] = None
+    link_template: Optional[str] = None
+    text_template: Optional[str] = None
+    min_interval: Optional[int] = None
+    max_interval: Optional[int] = None
+    output: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    def apply(self, config):
+        """Возвращает копию общей конфигурации с настройками аккаунта"""
+        overrides = {k: getattr(self, k) for k in ACCOUNT_OVERRIDES if getattr(self, k) is not None}
+        return replace(config, **overrides)
+
+
+def load_accounts(path):
+    """Загружает профили аккаунтов: JSON-список или {"accounts": [...]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('accounts', [])
+    profiles = [AccountProfile.from_dict(item) for item in data]
+    names = [p.name for p in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError("Имена аккаунтов должны быть уникальными")
+    return profiles
+
+
+def split_by_account(df, count):
+    """Раздает ранжированные записи аккаунтам по кругу.
+
+    Каждое изображение попадает ровно в один аккаунт, а лучшие записи
+    распределяются равномерно.
+    """
+    return [df.iloc[i::count] for i in range(count)]
+
+
+def resolve_slot_collisions(timelines, configs):
+    """Убирает общие слоты аккаунтов.
+
+    Аккаунты обрабатываются по порядку. Если расписание аккаунта
+    задевает минуты предыдущих, его даты строятся заново тем же
+    schedule_timeline, но с занятыми минутами в reserved - так сдвинутые
+    публикации остаются в окнах, в лимите дня, вне дат-исключений и
+    с минимальным интервалом.
+    """
+    used = pd.DatetimeIndex([])
+    resolved = []
+    for timeline, config in zip(timelines, configs):
+        timeline = pd.DatetimeIndex(timeline)
+        if len(used) and timeline.isin(used).any():
+            timeline = schedule_timeline(config, len(timeline), make_rng(config.seed), reserved=used)
+        used = used.append(timeline)
+        resolved.append(timeline)
+    return resolved
+
+
+def _plan_account(df, config_dict):
+    """Строит расписание одного аккаунта в отдельном процессе"""
+    return build_schedule(df, PlannerConfig.from_dict(config_dict))
+
+
+def plan_accounts(source, config, profiles, max_workers=None, status_callback=None):
+    """Планирует несколько аккаунтов по одному ранжированному источнику.
+
+    post_limit действует на каждый аккаунт. Возвращает словарь
+    {имя аккаунта: DataFrame расписания}.
+    """
+    total_limit = config.post_limit * len(profiles) if config.post_limit is not None else None
+    # Повторы одного изображения отбрасывает load_ranked - в разные аккаунты они не попадут
+    ranked = load_ranked(source, replace(config, post_limit=total_limit), status_callback)
+    parts = split_by_account(ranked, len(profiles))
+
+    account_configs = []
+    for index, profile in enumerate(profiles):
+        account_config = profile.apply(config)
+        if config.seed is not None:
+            account_config = replace(account_config, seed=config.seed + index)
+        account_configs.append(account_config)
+
+    if status_callback:
+        status_callback(f"Планирование {len(profiles)} аккаунтов...")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        schedules = list(executor.map(_plan_account, parts, [c.to_dict() for c in account_configs]))
+
+    timelines = resolve_slot_collisions([schedule['date'] for schedule in schedules], account_configs)
+    result = {}
+    for profile, schedule, timeline in zip(profiles, schedules, timelines):
+        schedule['date'] = timeline
+        result[profile.name] = format_schedule(schedule)
+    return result
+
+
+def account_output_path(profile, output_dir):
+    """Путь файла расписания аккаунта"""
+    if profile.output:
+        return profile.output if os.path.isabs(profile.output) else os.path.join(output_dir, profile.output)
+    return os.path.join(output_dir, f"{profile.name}_schedule.csv")
+
+
+def write_account_schedules(schedules, profiles, output_dir):
+    """Сохраняет по файлу расписания на аккаунт"""
+    paths = {}
+    for profile in profiles:
+        path = account_output_path(profile, output_dir)
+        write_schedule(schedules[profile.name], path)
+        paths[profile.name] = path
+    return paths
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+from openai import APIStatusError, AuthenticationError, PermissionDeniedError, RateLimitError
+
+# Квота не восстанавливается за минуту - ключ откладывается надолго
+QUOTA_COOLDOWN_SECONDS = 3600
+
+
+def retry_after(error):
+    """Пауза из заголовка Retry-After ответа или None"""
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def is_quota_error(error):
+    """Исчерпана квота или кредиты ключа (OpenAI: insufficient_quota, OpenRouter: 402)"""
+    body = getattr(error, 'body', None)
+    code = body.get('code') if isinstance(body, dict) else None
+    return code == 'insufficient_quota' or getattr(error, 'status_code', None) == 402
+
+
+class BatchRunner:
+    """Параллельная генерация текстов пакетами.
+
+    request(client, size) - корутина, возвращающая до size текстов.
+    Ключи и клиенты берутся из пула KeyPool по кругу, всего одновременно
+    выполняется не больше concurrency запросов, сколько бы ни было
+    ключей; темп задает RateLimiter ключа. Пакет, упершийся в лимит или квоту, переходит на
+    другой ключ, а ключ уходит на паузу. Результаты собираются в порядке
+    пакетов, прогресс сообщается по мере завершения любого пакета.
+    Если ответ обрезан (разобрано меньше текстов, чем запрошено),
+    недостающие тексты запрашиваются дополнительными пакетами.
+    on_texts(texts) получает непрерывное начало готовых текстов - его
+    можно сохранять в контрольную точку. При одном ключе и concurrency=1
+    пакеты идут строго по очереди с паузой delay между ними.
+    sizer - AdaptiveBatchSize: если задан, размер каждого следующего
+    пакета берется из него, а он учитывает время и полноту ответов.
+    """
+
+    def __init__(self, request, count, batch_size, pool, concurrency=1, delay=0.0,
+                 request_tokens=None, done=(), progress_callback=None, on_texts=None, on_error=None,
+                 on_key_error=None, sizer=None):
+        self.request = request
+        self.count = count
+        self.batch_size = max(1, int(batch_size))
+        self.pool = pool
+        self.concurrency = max(1, int(concurrency))
+        self.delay = delay
+        self.request_tokens = request_tokens or (lambda size: 0)
+        self.done = list(done)
+        self.progress_callback = progress_callback
+        self.on_texts = on_texts
+        self.on_error = on_error
+        self.on_key_error = on_key_error
+        self.sizer = sizer
+
+    async def run_async(self):
+        """Новые тексты всех пакетов по порядку (пакет с ошибкой дает меньше текстов)"""
+        self._results = {}
+        self._next_index = 0
+        self._allocated = len(self.done)
+        self._finished = 0
+        self._prefix = list(self.done)
+        self._prefix_index = 0
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+        finally:
+            await self.pool.aclose()
+        return [text for index in range(self._next_index) for text in self._results[index]]
+
+    def _next_batch(self):
+        if self._allocated >= self.count:
+            return None
+        batch_size = self.sizer.size if self.sizer else self.batch_size
+        size = min(batch_size, self.count - self._allocated)
+        index = self._next_index
+        self._next_index += 1
+        self._allocated += size
+        return index, size
+
+    async def _worker(self):
+        while (batch := self._next_batch()) is not None:
+            index, size = batch
+            self._complete(index, size, await self._run_batch(size))
+            if self.delay and self._allocated < self.count:
+                await asyncio.sleep(self.delay)
+
+    async def _run_batch(self, size):
+        """Один пакет; при лимите, квоте или неверном ключе - повтор на другом ключе"""
+        for _ in range(3 * max(1, len(self.pool))):
+            key = await self.pool.acquire()
+            if key is None:
+                break
+            await self.pool.limiters[key].acquire(self.request_tokens(size))
+            try:
+                started = time.monotonic()
+                texts = list(await self.request(self.pool.client(key), size))[:size]
+                if self.sizer:
+                    self.sizer.observe(size, len(texts), time.monotonic() - started)
+                return texts
+            except (AuthenticationError, PermissionDeniedError) as e:
+                self.pool.disable(key)
+                error = e
+            except APIStatusError as e:
+                if not isinstance(e, RateLimitError) and not is_quota_error(e):
+                    return self._failed(e)
+                self.pool.cool_down(key, QUOTA_COOLDOWN_SECONDS if is_quota_error(e) else retry_after(e))
+                error = e
+            except Exception as e:
+                return self._failed(e)
+            if self.on_key_error:
+                self.on_key_error(key, error)
+        return []
+
+    def _failed(self, error):
+        if self.on_error:
+            self.on_error(error)
+        return []
+
+    def _complete(self, index, size, texts):
+        if 0 < len(texts) < size:
+            # Обрезанный ответ: недостающее уйдет в следующие пакеты
+            self._allocated -= size - len(texts)
+        self._results[index] = texts
+        self._finished += len(texts)
+        if self.progress_callback:
+            self.progress_callback(len(self.done) + self._finished, self.count)
+
+        extended = False
+        while self._prefix_index in self._results:
+            self._prefix.extend(self._results[self._prefix_index])
+            self._prefix_index += 1
+            extended = True
+        if extended and self.on_texts:
+            self.on_texts(self._prefix)
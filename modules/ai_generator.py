@@ -1,11 +1,78 @@
+import asyncio
 import re
-import time
+import sqlite3
 import tkinter.messagebox as messagebox
-from openai import OpenAI, AuthenticationError, RateLimitError, APIError, APIConnectionError
-
+from openai import AsyncOpenAI, AuthenticationError, RateLimitError, APIError, APIConnectionError
+
+from config import (
+    AI_BATCH_MAX_SIZE, AI_CONCURRENCY, AI_REQUESTS_PER_MINUTE, AI_TOKENS_PER_MINUTE,
+    CHATGPT_REQUESTS_PER_MINUTE, CHATGPT_TOKENS_PER_MINUTE
+)
+from modules.ai_batches import BatchRunner
+from modules.ai_settings import ProviderSettings, TextSettings
+from modules.batch_size import BatchSizeStore
+from modules.checkpoint import MemoryCheckpoint
+from modules.key_pool import KeyPool, pool_keys
+from modules.text_cache import TextCache, cache_key
 from modules.utils import log_error
 
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+OPENROUTER_HEADERS = {
+    "HTTP-Referer": "https://github.com/yourusername/pinterest-planner",
+    "X-Title": "Pinterest Planner"
+}
+# Начальный размер пакета OpenRouter, пока для модели нет подобранного
+OPENROUTER_BATCH_SIZE = 10
+
+# Токенов на один вариант в ответе: до 100 символов кириллицы и нумерация
+TOKENS_PER_TEXT = 45
+# Запас бюджета ответа, чтобы последний вариант не обрезался
+TOKEN_BUDGET_SHARE = 0.9
+
+PROMPT_TEMPLATE = """
+        Сгенерируй {count} уникальных вариантов текста для пинов в Pinterest на тему:
+        "{base_text}"
+
+        Требования:
+        1. Каждый текст должен быть уникальным и не повторять другие варианты
+        2. Длина текста: не более 100 символов (без хештегов)
+        3. Не используй хештеги
+        4. Включи призыв к действию (например: "Узнай больше", "Скачай сейчас")
+        5. Пронумеруй варианты как: 1. [текст], 2. [текст], и т.д.
+        6. Сохрани маркетинговый стиль и тональность
+        7. Убедись, что текст завершен и имеет смысл
+        """
+
+
+def build_prompt(base_text, count):
+    """Запрос на count текстов по теме base_text"""
+    return PROMPT_TEMPLATE.format(count=count, base_text=base_text)
+
+
+def estimate_tokens(text):
+    """Грубая оценка числа токенов: кириллица - около 3 символов на токен"""
+    return len(text) // 3 + 1
+
+
+def budget_batch_size(max_tokens, tokens_per_text=TOKENS_PER_TEXT):
+    """Сколько вариантов помещается в ответ с лимитом max_tokens"""
+    return max(1, int(max_tokens * TOKEN_BUDGET_SHARE) // tokens_per_text)
+
+
+def batch_limit(max_tokens):
+    """Наибольший пакет: по лимиту токенов ответа, но не больше AI_BATCH_MAX_SIZE"""
+    return min(AI_BATCH_MAX_SIZE, budget_batch_size(max_tokens))
+
+
+def int_setting(var, default, minimum=0):
+    """Целое значение настройки из переменной интерфейса или default"""
+    try:
+        return max(minimum, int(var.get()))
+    except Exception:
+        return default
+
+
 def parse_ai_response(response, count):
     """Парсит ответ AI в список текстов"""
     texts = []
@@ -35,222 +102,364 @@ def parse_ai_response(response, count):
     return texts[:count]
 
 
-def generate_with_openrouter(app, base_text, count, progress_callback=None):
-    """Генерация текстов через OpenRouter API"""
-    api_key = app.openrouter_key_var.get()
-    if not api_key:
-        return generate_standard_texts(base_text, count, progress_callback)
-
+def openrouter_settings(app):
+    """Настройки OpenRouter из переменных интерфейса"""
+    concurrency = int_setting(app.openrouter_concurrency_var, AI_CONCURRENCY, minimum=1)
     try:
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-            default_headers={
-                "HTTP-Referer": "https://github.com/yourusername/pinterest-planner",
-                "X-Title": "Pinterest Planner"
-            }
+        delay = float(app.openrouter_delay_var.get())
+    except Exception:
+        delay = 5.0
+    return ProviderSettings(
+        provider='openrouter',
+        keys=tuple(pool_keys(app.openrouter_key_var.get(), app.openrouter_key_manager)),
+        model=app.openrouter_model_var.get(),
+        temperature=app.openrouter_temperature_var.get(),
+        max_tokens=app.openrouter_max_tokens_var.get(),
+        concurrency=concurrency,
+        requests_per_minute=int_setting(app.openrouter_rpm_var, AI_REQUESTS_PER_MINUTE),
+        tokens_per_minute=int_setting(app.openrouter_tpm_var, AI_TOKENS_PER_MINUTE),
+        # Пауза нужна только последовательному режиму, параллельный ограничивает лимитер
+        delay=max(5.0, delay) if concurrency == 1 else 0.0
+    )
+
+
+def chatgpt_settings(app):
+    """Настройки ChatGPT из переменных интерфейса"""
+    return ProviderSettings(
+        provider='openai',
+        keys=tuple(pool_keys(app.api_key_var.get(), app.openai_key_manager)),
+        model=app.ai_model_var.get(),
+        temperature=app.ai_temperature_var.get(),
+        max_tokens=app.ai_max_tokens_var.get(),
+        concurrency=int_setting(app.ai_concurrency_var, AI_CONCURRENCY, minimum=1),
+        requests_per_minute=int_setting(app.ai_rpm_var, CHATGPT_REQUESTS_PER_MINUTE),
+        tokens_per_minute=int_setting(app.ai_tpm_var, CHATGPT_TOKENS_PER_MINUTE)
+    )
+
+
+def ai_settings(app):
+    """Снимок настроек генерации текстов (TextSettings) для задания.
+
+    Читает переменные Tk, поэтому вызывается только в потоке интерфейса.
+    """
+    providers = []
+    if app.use_openrouter_var.get() and app.openrouter_key_var.get():
+        providers.append(openrouter_settings(app))
+    if app.ai_enabled.get() and app.api_key_var.get():
+        providers.append(chatgpt_settings(app))
+    template = app.text_template_var.get() if app.advanced_mode.get() else None
+    return TextSettings(tuple(providers), bool(app.ai_cache_var.get()), template or None)
+
+
+def status_reporter(app, status_callback=None):
+    """Куда писать статус генерации.
+
+    status_callback - строка задания в очереди; без него сообщение идет
+    в общую строку состояния через поток интерфейса (генерация
+    выполняется в потоках заданий, а Tk не потокобезопасен).
+    """
+    if status_callback:
+        return status_callback
+    return lambda message: app.run_in_ui(app.status_var.set, message)
+
+
+def report_failure(app, status, error, error_msg, title, message, dialog=messagebox.showwarning):
+    """Статус error_msg, запись в журнал и окно с ошибкой - в потоке интерфейса"""
+    status(error_msg)
+    app.run_in_ui(app.log_error, error)
+    app.run_in_ui(dialog, title, message)
+
+
+def key_error_reporter(status):
+    """Сообщение о статусе, когда пакет переходит на другой ключ"""
+    def report(key, error):
+        reason = "неверный ключ" if isinstance(error, AuthenticationError) else "лимит или квота"
+        status(f"Ключ ...{key[-4:]}: {reason}, пакет передан другому ключу")
+    return report
+
+
+def generate_batches(settings, base_text, count, client_factory, batch_size, done=(), progress_callback=None,
+                     checkpoint=None, on_error=None, on_key_error=None):
+    """Новые тексты пакетами со всех ключей провайдера через BatchRunner.
+
+    settings - ProviderSettings: ключи, модель, параллельность и лимиты.
+    Пул ключей делит лимиты провайдера с другими заданиями; размер
+    пакета начинается с подобранного для модели (или batch_size)
+    и запоминается после запуска. done - уже готовое начало текстов.
+    """
+    model = settings.model
+    max_tokens = settings.max_tokens
+    sizes = BatchSizeStore()
+
+    async def request(client, size):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": build_prompt(base_text, size)}],
+            temperature=settings.temperature,
+            max_tokens=max_tokens
         )
+        return parse_ai_response(response.choices[0].message.content.strip(), size)
 
-        prompt = f"""
-        Сгенерируй {count} уникальных вариантов текста для пинов в Pinterest на тему:
-        "{base_text}"
+    async def run():
+        pool = KeyPool(
+            settings.keys, client_factory, settings.requests_per_minute, settings.tokens_per_minute,
+            provider=settings.provider
+        )
+        sizer = sizes.sizer(model, batch_size, batch_limit(max_tokens))
+        runner = BatchRunner(
+            request, count, sizer.size, pool, settings.concurrency, settings.delay,
+            request_tokens=lambda size: estimate_tokens(build_prompt(base_text, size)) + max_tokens,
+            done=done, progress_callback=progress_callback,
+            on_texts=checkpoint.save if checkpoint else None, on_error=on_error,
+            on_key_error=on_key_error, sizer=sizer
+        )
+        new_texts = await runner.run_async()
+        sizes.remember(model, sizer)
+        return new_texts
 
-        Требования:
-        1. Каждый текст должен быть уникальным и не повторять другие варианты
-        2. Длина текста: не более 100 символов (без хештегов)
-        3. Не используй хештеги
-        4. Включи призыв к действию (например: "Узнай больше", "Скачай сейчас")
-        5. Пронумеруй варианты как: 1. [текст], 2. [текст], и т.д.
-        6. Сохрани маркетинговый стиль и тональность
-        7. Убедись, что текст завершен и имеет смысл
-        """
+    return asyncio.run(run())
 
-        temperature = app.openrouter_temperature_var.get()
-        max_tokens = app.openrouter_max_tokens_var.get()
-        model = app.openrouter_model_var.get()
 
-        try:
-            delay_val = float(app.openrouter_delay_var.get())
-        except:
-            delay_val = 5.0
-        delay = max(5.0, delay_val)
-
-        batch_size = 10
-        texts = []
-        for i in range(0, count, batch_size):
-            current_count = min(batch_size, count - i)
-            current_prompt = prompt.replace(f"{count}", f"{current_count}")
-
-            try:
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": current_prompt}],
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-
-                full_response = response.choices[0].message.content.strip()
-                batch_texts = parse_ai_response(full_response, current_count)
-                texts.extend(batch_texts)
-
-                # Обновляем прогресс
-                current_progress = i + len(batch_texts)
-                if progress_callback:
-                    progress_callback(current_progress, count)
-
-                time.sleep(delay)
-            except Exception as e:
-                app.status_var.set(f"Ошибка генерации: {str(e)}")
-                # Логируем ошибку, но продолжаем генерацию
-                log_error(e, app)
+def resume_texts(status, checkpoint, count, progress_callback=None):
+    """Тексты, уже сохраненные в контрольной точке прошлого запуска"""
+    if checkpoint is None or not checkpoint.texts:
+        return []
+    texts = list(checkpoint.texts)
+    status(f"Продолжение генерации: готово {len(texts)} из {count} текстов")
+    if progress_callback:
+        progress_callback(len(texts), count)
+    return texts
+
+
+def generate_with_openrouter(app, settings, base_text, count, progress_callback=None, number_start=101,
+                             checkpoint=None, status_callback=None):
+    """Генерация текстов через OpenRouter API.
+
+    settings - ProviderSettings из снимка задания. Пакеты отправляются
+    параллельно со всех ключей пула (всего не больше settings.concurrency
+    запросов одновременно) с ограничением запросов и токенов в минуту
+    на ключ; тексты собираются в исходном порядке.
+    Размер пакета подстраивается по задержке и полноте ответов (не больше,
+    чем помещается в settings.max_tokens) и запоминается для модели.
+    При одном ключе и одном потоке пакеты идут по очереди с паузой
+    settings.delay, как раньше.
+    checkpoint - TextCheckpoint: готовое начало текстов сохраняется после
+    каждого пакета, повторный запуск продолжает с места остановки.
+    status_callback(message) - статус генерации (по умолчанию общая строка
+    состояния). app нужен только для вызовов app.run_in_ui.
+    """
+    status = status_reporter(app, status_callback)
+    if not settings.keys:
+        return generate_standard_texts(base_text, count, progress_callback, number_start)
+
+    try:
+        def on_error(e):
+            status(f"Ошибка генерации: {str(e)}")
+            # Логируем ошибку, но продолжаем генерацию
+            app.run_in_ui(log_error, e, app)
+
+        texts = resume_texts(status, checkpoint, count, progress_callback)
+        texts.extend(generate_batches(
+            settings, base_text, count,
+            lambda key: AsyncOpenAI(base_url=OPENROUTER_BASE_URL, api_key=key, default_headers=OPENROUTER_HEADERS),
+            OPENROUTER_BATCH_SIZE, done=texts, progress_callback=progress_callback, checkpoint=checkpoint,
+            on_error=on_error, on_key_error=key_error_reporter(status)
+        ))
 
         # Если сгенерировали меньше текстов, чем нужно
         if len(texts) < count:
             last_text = texts[-1] if texts else base_text
-            additional = generate_standard_texts(last_text, count - len(texts), None)
+            additional = generate_standard_texts(last_text, count - len(texts), None, number_start + len(texts))
             texts.extend(additional)
 
         return texts[:count]
 
     except Exception as e:
         error_msg = f"Ошибка при генерации текстов через OpenRouter: {str(e)}"
-        app.status_var.set(error_msg)
-        app.log_error(e)
-        messagebox.showwarning(
-            "Ошибка генерации",
+        report_failure(
+            app, status, e, error_msg, "Ошибка генерации",
             f"{error_msg}\n\nТексты сгенерированы стандартным методом."
         )
-        return generate_standard_texts(base_text, count, progress_callback)
+        return generate_standard_texts(base_text, count, progress_callback, number_start)
 
     pass
 
 
-def generate_with_chatgpt(app, base_text, count, progress_callback=None):
-    """Генерация текстов через ChatGPT API"""
-    api_key = app.api_key_var.get()
-    if not api_key:
-        return generate_standard_texts(base_text, count, progress_callback)
+def generate_with_chatgpt(app, settings, base_text, count, progress_callback=None, number_start=101,
+                          checkpoint=None, status_callback=None):
+    """Генерация текстов через ChatGPT API.
 
-    try:
-        client = OpenAI(api_key=api_key)
+    settings - ProviderSettings из снимка задания. Тексты запрашиваются
+    пакетами не больше, чем помещается в лимит токенов ответа
+    (settings.max_tokens); при обрезанных или медленных ответах пакет
+    уменьшается, подобранный размер запоминается для модели.
+    Пакеты идут параллельно, как в generate_with_openrouter: со всех
+    ключей пула, не больше settings.concurrency запросов одновременно,
+    с ограничением запросов и токенов в минуту на ключ.
+    """
+    status = status_reporter(app, status_callback)
+    if not settings.keys:
+        return generate_standard_texts(base_text, count, progress_callback, number_start)
 
-        prompt = f"""
-        Сгенерируй {count} уникальных вариантов текста для пинов в Pinterest на тему:
-        "{base_text}"
+    resumed = resume_texts(status, checkpoint, count, progress_callback)
+    if len(resumed) >= count:
+        return resumed[:count]
 
-        Требования:
-        1. Каждый текст должен быть уникальным и не повторять другие варианты
-        2. Длина текста: не более 100 символов (без хештегов)
-        3. Не используй хештеги
-        4. Включи призыв к действию (например: "Узнай больше", "Скачай сейчас")
-        5. Пронумеруй варианты как: 1. [текст], 2. [текст], и т.д.
-        6. Сохрани маркетинговый стиль и тональность
-        7. Убедись, что текст завершен и имеет смысл
-        """
+    try:
+        errors = []
+        report_key_error = key_error_reporter(status)
 
-        temperature = app.ai_temperature_var.get()
-        max_tokens = app.ai_max_tokens_var.get()
-        model = app.ai_model_var.get()
+        def on_key_error(key, error):
+            errors.append(error)
+            report_key_error(key, error)
 
         try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature,
-                max_tokens=max_tokens
+            texts = resumed + generate_batches(
+                settings, base_text, count, lambda key: AsyncOpenAI(api_key=key), batch_limit(settings.max_tokens),
+                done=resumed, progress_callback=progress_callback, checkpoint=checkpoint,
+                on_error=errors.append, on_key_error=on_key_error
             )
-
-            full_response = response.choices[0].message.content.strip()
-            texts = parse_ai_response(full_response, count)
-
-            # Обновляем прогресс
-            if progress_callback:
-                progress_callback(len(texts), count)
+            if len(texts) == len(resumed) and errors:
+                # Ни один ключ не ответил - показываем причину, как раньше
+                raise errors[-1]
 
             # Если сгенерировали меньше текстов, чем нужно
             if len(texts) < count:
                 last_text = texts[-1] if texts else base_text
-                additional = generate_standard_texts(last_text, count - len(texts), None)
+                additional = generate_standard_texts(last_text, count - len(texts), None, number_start + len(texts))
                 texts.extend(additional)
 
             return texts
 
         except RateLimitError as e:
             error_msg = "Превышен лимит запросов к ChatGPT API!"
-            app.status_var.set(error_msg)
-            app.log_error(e)
-            messagebox.showwarning(
-                "Ошибка лимита",
+            report_failure(
+                app, status, e, error_msg, "Ошибка лимита",
                 f"{error_msg}\nПожалуйста, подождите или используйте другой API ключ."
             )
-            return generate_standard_texts(base_text, count, progress_callback)
+            return generate_standard_texts(base_text, count, progress_callback, number_start)
 
         except AuthenticationError as e:
             error_msg = "Ошибка аутентификации ChatGPT API!"
-            app.status_var.set(error_msg)
-            app.log_error(e)
-            messagebox.showwarning(
-                "Ошибка аутентификации",
+            report_failure(
+                app, status, e, error_msg, "Ошибка аутентификации",
                 f"{error_msg}\nПроверьте правильность API ключа."
             )
-            return generate_standard_texts(base_text, count, progress_callback)
+            return generate_standard_texts(base_text, count, progress_callback, number_start)
 
         except Exception as e:
             error_msg = f"Ошибка при генерации текстов через ChatGPT: {str(e)}"
-            app.status_var.set(error_msg)
-            app.log_error(e)
-            messagebox.showwarning(
-                "Ошибка генерации",
+            report_failure(
+                app, status, e, error_msg, "Ошибка генерации",
                 f"{error_msg}\nТексты сгенерированы стандартным методом."
             )
-            return generate_standard_texts(base_text, count, progress_callback)
+            return generate_standard_texts(base_text, count, progress_callback, number_start)
 
     except Exception as e:
         error_msg = f"Критическая ошибка при подключении к ChatGPT: {str(e)}"
-        app.status_var.set(error_msg)
-        app.log_error(e)
-        messagebox.showerror(
-            "Ошибка подключения",
-            f"{error_msg}\nПроверьте подключение к интернету и настройки API."
+        report_failure(
+            app, status, e, error_msg, "Ошибка подключения",
+            f"{error_msg}\nПроверьте подключение к интернету и настройки API.", dialog=messagebox.showerror
         )
-        return generate_standard_texts(base_text, count, progress_callback)
+        return generate_standard_texts(base_text, count, progress_callback, number_start)
 
 
     pass
 
 
-def generate_standard_texts(base_text, count, progress_callback=None):
+def generate_standard_texts(base_text, count, progress_callback=None, number_start=101):
     """Генерация стандартных текстов с нумерацией"""
     texts = []
     for i in range(count):
-        texts.append(f"{base_text} #{101 + i}")
+        texts.append(f"{base_text} #{number_start + i}")
         if progress_callback:
             progress_callback(i + 1, count)
     return texts
 
 
-def generate_unique_texts(app, base_text, count, progress_callback=None):
-    """Генерация уникальных текстов с возможностью использования AI"""
-    if app.use_openrouter_var.get() and app.openrouter_key_var.get():
+def generate_cached(app, generator, settings, base_text, count, progress_callback=None, number_start=101,
+                    checkpoint=None, status_callback=None, use_cache=True, exclude=()):
+    """Генерация через кэш текстов AI.
+
+    Сначала берутся тексты из кэша по провайдеру, модели, температуре,
+    шаблону запроса и теме; API запрашивается только для недостающих.
+    Кэшированное начало передается генератору как контрольная точка, а
+    новые тексты AI (без заглушек) после генерации добавляются в кэш.
+    settings - ProviderSettings генератора; use_cache=False - без кэша.
+    exclude - тексты, которые нельзя брать из кэша (уже в расписании).
+    """
+    if not use_cache:
+        return generator(app, settings, base_text, count, progress_callback, number_start, checkpoint, status_callback)
+
+    status = status_reporter(app, status_callback)
+
+    cache = TextCache()
+    key = cache_key(settings.cache_settings(), PROMPT_TEMPLATE, base_text)
+    checkpoint = checkpoint if checkpoint is not None else MemoryCheckpoint()
+    from_cache = 0
+    if not checkpoint.texts:
         try:
-            return generate_with_openrouter(app, base_text, count, progress_callback)
-        except Exception as e:
-            messagebox.showwarning(
-                "Ошибка OpenRouter",
-                f"Не удалось сгенерировать тексты: {str(e)}. Используется базовый метод."
+            cached = cache.get(key, count, exclude)
+        except sqlite3.Error as e:
+            # Поврежденный или занятый кэш не должен мешать генерации
+            app.run_in_ui(log_error, e, app)
+            return generator(
+                app, settings, base_text, count, progress_callback, number_start, checkpoint, status_callback
             )
+        if len(cached) >= count:
+            status(f"Тексты взяты из кэша: {count}")
+            if progress_callback:
+                progress_callback(count, count)
+            return cached
+        if cached:
+            status(f"Из кэша: {len(cached)} из {count} текстов, остальные генерируются")
+            checkpoint.save(cached)
+            from_cache = len(cached)
+
+    texts = generator(app, settings, base_text, count, progress_callback, number_start, checkpoint, status_callback)
+    # В контрольную точку попадают только ответы AI, заглушки в кэш не идут
+    try:
+        cache.put(key, checkpoint.texts[from_cache:])
+    except sqlite3.Error as e:
+        app.run_in_ui(log_error, e, app)
+    return texts
 
-    if app.ai_enabled.get() and app.api_key_var.get():
+
+# Генератор и заголовок предупреждения об ошибке по провайдеру
+GENERATORS = {
+    'openrouter': (generate_with_openrouter, "Ошибка OpenRouter"),
+    'openai': (generate_with_chatgpt, "Ошибка AI"),
+}
+
+
+def generate_unique_texts(app, settings, base_text, count, progress_callback=None, number_start=101,
+                          checkpoint=None, status_callback=None, exclude=()):
+    """Генерация уникальных текстов с возможностью использования AI.
+
+    settings - TextSettings, снимок настроек на момент постановки задания:
+    провайдеры пробуются по порядку, без AI тексты идут по шаблону или
+    с нумерацией. Тексты AI сначала ищутся в кэше (generate_cached),
+    кроме текстов из exclude - уже стоящих в расписании.
+    checkpoint - TextCheckpoint для продолжения прерванной генерации.
+    status_callback(message) - статус генерации в строке задания.
+    Вызывается из потоков заданий: переменные Tk не читаются, окна и
+    общая строка состояния обновляются через app.run_in_ui.
+    """
+    for provider in settings.providers:
+        generator, title = GENERATORS[provider.provider]
         try:
-            return generate_with_chatgpt(app, base_text, count, progress_callback)
+            return generate_cached(
+                app, generator, provider, base_text, count, progress_callback, number_start, checkpoint,
+                status_callback, settings.use_cache, exclude
+            )
         except Exception as e:
-            messagebox.showwarning(
-                "Ошибка AI",
+            app.run_in_ui(
+                messagebox.showwarning,
+                title,
                 f"Не удалось сгенерировать тексты: {str(e)}. Используется базовый метод."
             )
 
-    if app.advanced_mode.get() and app.text_template_var.get():
-        template = app.text_template_var.get()
-        return [template.replace('{num}', str(101 + i)) for i in range(count)]
+    if settings.text_template:
+        return [settings.text_template.replace('{num}', str(number_start + i)) for i in range(count)]
 
-    return generate_standard_texts(base_text, count, progress_callback)
\ No newline at end of file
+    return generate_standard_texts(base_text, count, progress_callback, number_start)
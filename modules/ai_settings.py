@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ProviderSettings:
+    """Параметры одного провайдера AI: ключи пула, модель и лимиты"""
+    provider: str
+    keys: tuple
+    model: str
+    temperature: float
+    max_tokens: int
+    concurrency: int
+    requests_per_minute: int
+    tokens_per_minute: int
+    # Пауза между пакетами последовательного режима, секунды
+    delay: float = 0.0
+
+    def cache_settings(self):
+        """Параметры, от которых зависят тексты: для ключей кэша и контрольных точек"""
+        return {
+            'provider': self.provider,
+            'model': self.model,
+            'temperature': self.temperature,
+            'max_tokens': self.max_tokens
+        }
+
+
+@dataclass(frozen=True)
+class TextSettings:
+    """Снимок настроек генерации текстов на момент постановки задания.
+
+    Собирается в потоке интерфейса, как и PlannerConfig; задание читает
+    только его, поэтому изменения в окне не затрагивают задания, уже
+    стоящие в очереди.
+    providers - провайдеры AI в порядке попыток (пусто - без AI),
+    text_template - шаблон текста расширенного режима.
+    """
+    providers: tuple = ()
+    use_cache: bool = True
+    text_template: Optional[str] = None
+
+    @property
+    def uses_ai(self):
+        return bool(self.providers)
+
+    def cache_settings(self):
+        """Параметры первого провайдера или None без AI"""
+        return self.providers[0].cache_settings() if self.providers else None
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+
+from config import AI_BATCH_SIZES_FILE, AI_BATCH_MAX_SIZE
+
+# Ответ медленнее ожидаемого во столько раз считается всплеском задержки
+LATENCY_SPIKE_FACTOR = 2.0
+# Вес последнего ответа в скользящей средней времени на один текст
+LATENCY_SMOOTHING = 0.3
+# Рост пакета после полного и быстрого ответа и уменьшение при всплеске задержки
+GROWTH_FACTOR = 1.25
+SHRINK_FACTOR = 0.75
+
+_store_lock = threading.Lock()
+
+
+class AdaptiveBatchSize:
+    """Размер пакета, подстраиваемый по ответам модели.
+
+    Пакет растет, пока ответы приходят полными и не медленнее обычного.
+    Обрезанный ответ (разобрано меньше текстов, чем запрошено) сжимает
+    пакет до числа полученных текстов, всплеск задержки - на четверть.
+    Задержка сравнивается со средним временем на один текст, поэтому
+    естественный рост времени ответа с размером пакета всплеском не считается.
+    """
+
+    def __init__(self, size, maximum=AI_BATCH_MAX_SIZE, minimum=1):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.size = self._clamp(size)
+        self.per_text = None
+        self.observed = False
+
+    def _clamp(self, size):
+        return max(self.minimum, min(self.maximum, int(size)))
+
+    def observe(self, requested, received, elapsed):
+        """Учитывает ответ на пакет из requested текстов.
+
+        Пустые ответы (ошибки запроса) размер не меняют: причина не в нем.
+        """
+        if requested <= 0 or received <= 0:
+            return
+        self.observed = True
+        per_text = elapsed / received
+        expected = self.per_text
+        self.per_text = per_text if expected is None else (
+            expected + LATENCY_SMOOTHING * (per_text - expected)
+        )
+
+        if received < requested:
+            self.size = self._clamp(min(self.size, received))
+        elif expected is not None and per_text > LATENCY_SPIKE_FACTOR * expected:
+            self.size = self._clamp(self.size * SHRINK_FACTOR)
+        elif requested >= self.size and (expected is None or per_text <= expected):
+            # Растем только по пакетам текущего размера: хвостовой пакет меньше
+            self.size = self._clamp(max(self.size + 1, self.size * GROWTH_FACTOR))
+
+
+class BatchSizeStore:
+    """Подобранные размеры пакетов по моделям в JSON-файле между запусками"""
+
+    def __init__(self, path=AI_BATCH_SIZES_FILE):
+        self.path = path
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, model, default):
+        try:
+            return int(self._load().get(model, default))
+        except (TypeError, ValueError):
+            return default
+
+    def save(self, model, size):
+        with _store_lock:
+            data = self._load()
+            data[model] = int(size)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def sizer(self, model, default, maximum=AI_BATCH_MAX_SIZE):
+        """AdaptiveBatchSize, начинающий с сохраненного для модели размера"""
+        return AdaptiveBatchSize(self.get(model, default), maximum)
+
+    def remember(self, model, sizer):
+        """Сохраняет размер, если он подбирался по реальным ответам"""
+        if sizer.observed:
+            try:
+                self.save(model, sizer.size)
+            except OSError:
+                pass
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import time
+
+from config import CHECKPOINT_DIR, CHECKPOINT_MAX_AGE_DAYS
+from modules.input_cache import file_hash
+from modules.merge import split_inputs
+
+
+def job_key(input_path, settings):
+    """Ключ задания: хэш содержимого входных файлов и настроек"""
+    h = hashlib.blake2b(digest_size=16)
+    for path in split_inputs(input_path):
+        h.update(file_hash(path).encode('utf-8'))
+    h.update(json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+def drop_stale(checkpoint_dir=CHECKPOINT_DIR, max_age_days=CHECKPOINT_MAX_AGE_DAYS):
+    """Удаляет заброшенные контрольные точки старше max_age_days"""
+    if not os.path.isdir(checkpoint_dir):
+        return
+    cutoff = time.time() - max_age_days * 86400
+    for name in os.listdir(checkpoint_dir):
+        path = os.path.join(checkpoint_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+class MemoryCheckpoint:
+    """Контрольная точка в памяти - когда задание не сохраняет прогресс на диск"""
+
+    def __init__(self):
+        self.texts = []
+
+    def save(self, texts):
+        self.texts = list(texts)
+
+    def clear(self):
+        self.texts = []
+
+
+class TextCheckpoint:
+    """Контрольная точка генерации текстов AI.
+
+    После каждого пакета готовые тексты сохраняются на диск; повторный
+    запуск того же задания (тот же файл и настройки) продолжает с
+    последнего завершенного пакета. После успешного сохранения
+    расписания контрольная точка удаляется.
+    """
+
+    def __init__(self, key, count, number_start, checkpoint_dir=CHECKPOINT_DIR):
+        self.count = count
+        self.number_start = number_start
+        self.path = os.path.join(checkpoint_dir, f"{key}_{number_start}_{count}.json")
+        self.texts = self._load()
+
+    @classmethod
+    def for_job(cls, key, count, number_start, checkpoint_dir=CHECKPOINT_DIR):
+        drop_stale(checkpoint_dir)
+        return cls(key, count, number_start, checkpoint_dir)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            # Поврежденная контрольная точка - начинаем заново
+            return []
+        if state.get('count') != self.count or state.get('number_start') != self.number_start:
+            return []
+        return list(state.get('texts', []))[:self.count]
+
+    def save(self, texts):
+        """Атомарно сохраняет уже сгенерированные тексты"""
+        self.texts = list(texts)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        state = {
+            'count': self.count,
+            'number_start': self.number_start,
+            'texts': self.texts,
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.texts = []
@@ -0,0 +1,321 @@
+"""Консольный запуск планировщика без интерфейса.
+
+Пример:
+    python -m modules.cli plan export1.xlsx export2.csv --profile settings.json --jobs 4
+    python -m modules.cli plan export1.xlsx export2.csv --merge -o schedule.csv
+    python -m modules.cli accounts export.xlsx --accounts accounts.json --output-dir schedules
+    python -m modules.cli watch exports/ --profile settings.json
+    python -m modules.cli preview export.csv --profile settings.json --rows 20
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from config import POSTED_INDEX_FILE
+from modules.accounts import load_accounts, plan_accounts, write_account_schedules
+from modules.engine import (
+    PlannerConfig, PlannerError, PREVIEW_ROWS, plan, plan_append, preview, write_schedule, record_posted
+)
+from modules.merge import load_sources
+from modules.ranking import SCORERS
+from modules.watcher import FolderWatcher, DEFAULT_SETTLE_SECONDS, DEFAULT_POLL_INTERVAL
+
+
+def load_profile(path):
+    """Загружает профиль настроек планировщика из JSON"""
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_config(args):
+    """Собирает конфигурацию: профиль, поверх него аргументы командной строки"""
+    data = load_profile(args.profile)
+    overrides = {
+        'start_date': args.date,
+        'start_time': args.time,
+        'min_interval': args.min_interval,
+        'max_interval': args.max_interval,
+        'post_limit': args.post_limit,
+        'min_saves': args.min_saves,
+        'base_text': args.base_text,
+        'base_link': args.base_link,
+        'link_template': args.link_template,
+        'text_template': args.text_template,
+        'seed': args.seed,
+        'daily_cap': args.daily_cap,
+        'posted_index': args.posted_index,
+        'ranking': args.ranking,
+    }
+    data.update({k: v for k, v in overrides.items() if v is not None})
+    if args.sort_by_saves_only:
+        data['sort_by_saves_only'] = True
+    if args.no_shuffle:
+        data['shuffle'] = False
+    if args.windows is not None:
+        data['posting_windows'] = {'*': args.windows}
+    if args.blackout is not None:
+        data['blackout_dates'] = [d for d in args.blackout.split(',') if d.strip()]
+    if args.ranking_param:
+        params = dict(data.get('ranking_params') or {})
+        for item in args.ranking_param:
+            key, _, value = item.partition('=')
+            params[key.strip()] = float(value)
+        data['ranking_params'] = params
+    if args.append:
+        data['append'] = True
+    if args.streaming:
+        data['streaming'] = True
+    if args.chunk_size is not None:
+        data['chunk_size'] = args.chunk_size
+    return PlannerConfig.from_dict(data)
+
+
+def output_path_for(input_path, args):
+    """Определяет путь результата для входного файла"""
+    if args.output:
+        return args.output
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    out_dir = args.output_dir or os.path.dirname(os.path.abspath(input_path))
+    return os.path.join(out_dir, f"{stem}_schedule.{args.format}")
+
+
+def plan_file(input_path, output_path, config_dict):
+    """Планирует один файл (или список объединяемых выгрузок); вызывается в отдельном процессе"""
+    config = PlannerConfig.from_dict(config_dict)
+    source = load_sources(input_path)
+    if config.append:
+        df_output = plan_append(source, config, output_path)
+    else:
+        df_output = plan(source, config)
+    write_schedule(df_output, output_path, append=config.append)
+    # История пишется в основном процессе, чтобы процессы не перезаписывали индекс друг друга
+    return df_output['image1'].to_numpy()
+
+
+def run_plan(args):
+    if args.output and len(args.inputs) > 1 and not args.merge:
+        print("Параметр --output допустим только для одного файла, используйте --output-dir", file=sys.stderr)
+        return 2
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    config = build_config(args)
+    config_dict = config.to_dict()
+    if args.merge:
+        # Одно расписание из всех выгрузок
+        first_dir = os.path.dirname(os.path.abspath(args.inputs[0]))
+        jobs = {tuple(args.inputs): output_path_for(os.path.join(first_dir, 'merged'), args)}
+    else:
+        jobs = {path: output_path_for(path, args) for path in args.inputs}
+    failed = 0
+    planned_images = []
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {
+            executor.submit(plan_file, input_path, output_path, config_dict): input_path
+            for input_path, output_path in jobs.items()
+        }
+        for future in as_completed(futures):
+            input_path = futures[future]
+            if isinstance(input_path, tuple):
+                input_path = ", ".join(input_path)
+            try:
+                images = future.result()
+                planned_images.append(images)
+                print(f"{input_path}: сгенерировано {len(images)} записей -> {jobs[futures[future]]}")
+            except PlannerError as e:
+                failed += 1
+                print(f"{input_path}: {e.status}\n{e.message}", file=sys.stderr)
+            except Exception as e:
+                failed += 1
+                print(f"{input_path}: ошибка {type(e).__name__}: {e}", file=sys.stderr)
+
+    if planned_images:
+        record_posted(pd.DataFrame({'image1': np.concatenate(planned_images)}), config)
+    return 1 if failed else 0
+
+
+def run_accounts(args):
+    try:
+        profiles = load_accounts(args.accounts)
+    except (OSError, ValueError) as e:
+        print(f"Не удалось загрузить профили аккаунтов: {e}", file=sys.stderr)
+        return 2
+    if not profiles:
+        print("В файле профилей нет аккаунтов", file=sys.stderr)
+        return 2
+
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.input))
+    os.makedirs(output_dir, exist_ok=True)
+    config = build_config(args)
+    try:
+        schedules = plan_accounts(args.input, config, profiles, max_workers=args.jobs)
+    except PlannerError as e:
+        print(f"{args.input}: {e.status}\n{e.message}", file=sys.stderr)
+        return 1
+
+    paths = write_account_schedules(schedules, profiles, output_dir)
+    record_posted(pd.concat(schedules.values()), config)
+    for profile in profiles:
+        print(f"{profile.name}: сгенерировано {len(schedules[profile.name])} записей -> {paths[profile.name]}")
+    return 0
+
+
+def run_preview(args):
+    config = build_config(args)
+    try:
+        result = preview(load_sources(args.inputs), config, rows=args.rows, output_path=args.output)
+    except PlannerError as e:
+        print(f"{', '.join(args.inputs)}: {e.status}\n{e.message}", file=sys.stderr)
+        return 1
+
+    with pd.option_context('display.max_colwidth', 60, 'display.width', 200):
+        print(result.rows.to_string(index=False))
+    read = f" из {result.read_rows}" if result.read_rows is not None else ""
+    print(f"\nПрошло фильтры: {result.planned_rows}{read} строк")
+    print(f"Расписание: с {result.start:%d.%m.%Y %H:%M} по {result.end:%d.%m.%Y %H:%M}")
+    print("Тексты в предпросмотре - заглушки по шаблону, AI не вызывался")
+    return 0
+
+
+def run_watch(args):
+    if not os.path.isdir(args.directory):
+        print(f"Каталог не найден: {args.directory}", file=sys.stderr)
+        return 2
+    config = build_config(args)
+    config_dict = config.to_dict()
+
+    def log(message):
+        print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", flush=True)
+
+    def handle(input_path):
+        output_path = output_path_for(input_path, args)
+        log(f"{os.path.basename(input_path)}: планирование...")
+        images = plan_file(input_path, output_path, config_dict)
+        record_posted(pd.DataFrame({'image1': images}), config)
+        log(f"{os.path.basename(input_path)}: сгенерировано {len(images)} записей -> {output_path}")
+        return output_path
+
+    watcher = FolderWatcher(
+        args.directory, handle, patterns=args.pattern, settle_seconds=args.settle,
+        poll_interval=args.interval, polling=args.polling, log=log
+    )
+    if args.once:
+        watcher.run_once()
+        return 0
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        log("Наблюдение остановлено")
+    return 0
+
+
+def add_config_arguments(parser):
+    """Аргументы, переопределяющие поля PlannerConfig"""
+    parser.add_argument('--profile', help="JSON-профиль с настройками планировщика")
+    parser.add_argument('--date', help="Дата начала ДД.ММ.ГГГГ")
+    parser.add_argument('--time', help="Время начала ЧЧ:ММ")
+    parser.add_argument('--min-interval', type=int, help="Мин. интервал (мин)")
+    parser.add_argument('--max-interval', type=int, help="Макс. интервал (мин)")
+    parser.add_argument('--post-limit', type=int, help="Ограничение количества постов")
+    parser.add_argument('--min-saves', type=float, help="Минимальное количество сохранений")
+    parser.add_argument('--ranking', choices=sorted(SCORERS), help="Формула ранжирования")
+    parser.add_argument(
+        '--ranking-param', action='append', metavar='KEY=VALUE',
+        help="Параметр формулы, например half_life_days=14"
+    )
+    parser.add_argument('--sort-by-saves-only', action='store_true', help="Сортировать только по сохранениям")
+    parser.add_argument('--no-shuffle', action='store_true', help="Не перемешивать строки")
+    parser.add_argument('--base-text', help="Базовый текст")
+    parser.add_argument('--base-link', help="Базовая ссылка")
+    parser.add_argument('--link-template', help="Шаблон ссылки, например /?{num}")
+    parser.add_argument('--text-template', help="Шаблон текста, например #{num}")
+    parser.add_argument('--seed', type=int, help="Seed генератора для воспроизводимого плана")
+    parser.add_argument('--windows', help="Окна публикаций на все дни, например '09:00-12:00,18:00-22:00'")
+    parser.add_argument('--blackout', help="Даты без публикаций через запятую, ДД.ММ.ГГГГ")
+    parser.add_argument('--daily-cap', type=int, help="Максимум публикаций в день")
+    parser.add_argument('--append', action='store_true', help="Дописать в существующее расписание")
+    parser.add_argument(
+        '--posted-index', nargs='?', const=POSTED_INDEX_FILE,
+        help=f"Пропускать уже запланированные пины и запоминать новые (по умолчанию {POSTED_INDEX_FILE})"
+    )
+    parser.add_argument('--streaming', action='store_true', help="Читать CSV частями и хранить только лучшие записи")
+    parser.add_argument('--chunk-size', type=int, help="Размер части при потоковом чтении")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m modules.cli", description="Pinterest Planner без интерфейса")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    plan_parser = subparsers.add_parser('plan', help="Построить расписание для одного или нескольких файлов")
+    plan_parser.add_argument('inputs', nargs='+', help="Входные CSV/Excel файлы")
+    plan_parser.add_argument('-o', '--output', help="Файл результата (только для одного входного файла)")
+    plan_parser.add_argument('--output-dir', help="Каталог для результатов")
+    plan_parser.add_argument(
+        '--format', choices=['csv', 'csv.gz', 'parquet', 'jsonl'], default='csv',
+        help="Формат результатов в --output-dir (для --output определяется по расширению)"
+    )
+    plan_parser.add_argument(
+        '--merge', action='store_true',
+        help="Объединить выгрузки (без повторов изображений) и построить одно расписание"
+    )
+    plan_parser.add_argument('-j', '--jobs', type=int, default=None, help="Количество процессов")
+    add_config_arguments(plan_parser)
+    plan_parser.set_defaults(func=run_plan)
+
+    accounts_parser = subparsers.add_parser('accounts', help="Построить расписания для нескольких аккаунтов")
+    accounts_parser.add_argument('input', help="Входной CSV/Excel файл")
+    accounts_parser.add_argument('--accounts', required=True, help="JSON с профилями аккаунтов")
+    accounts_parser.add_argument('--output-dir', help="Каталог для расписаний аккаунтов")
+    accounts_parser.add_argument('-j', '--jobs', type=int, default=None, help="Количество процессов")
+    add_config_arguments(accounts_parser)
+    accounts_parser.set_defaults(func=run_accounts)
+
+    preview_parser = subparsers.add_parser(
+        'preview', help="Быстрый предпросмотр: первые строки расписания без AI и без записи"
+    )
+    preview_parser.add_argument('inputs', nargs='+', help="Входные CSV/Excel файлы (несколько - объединяются)")
+    preview_parser.add_argument('-n', '--rows', type=int, default=PREVIEW_ROWS, help="Сколько строк показать")
+    preview_parser.add_argument('-o', '--output', help="Существующее расписание (для --append)")
+    add_config_arguments(preview_parser)
+    preview_parser.set_defaults(func=run_preview)
+
+    watch_parser = subparsers.add_parser(
+        'watch', help="Следить за каталогом и планировать новые выгрузки (расписание - рядом с файлом)"
+    )
+    watch_parser.add_argument('directory', help="Каталог, куда попадают выгрузки")
+    watch_parser.add_argument(
+        '--pattern', action='append',
+        help="Шаблон имени выгрузки, можно несколько (по умолчанию *.xlsx, *.xls, *.csv)"
+    )
+    watch_parser.add_argument(
+        '--settle', type=float, default=DEFAULT_SETTLE_SECONDS,
+        help="Сколько секунд файл не должен меняться, чтобы считаться дописанным"
+    )
+    watch_parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL, help="Период опроса (с)")
+    watch_parser.add_argument('--polling', action='store_true', help="Опрос каталога вместо inotify")
+    watch_parser.add_argument('--once', action='store_true', help="Обработать готовые файлы и завершиться")
+    watch_parser.add_argument(
+        '--format', choices=['csv', 'csv.gz', 'parquet', 'jsonl'], default='csv', help="Формат расписаний"
+    )
+    add_config_arguments(watch_parser)
+    watch_parser.set_defaults(func=run_watch, output=None, output_dir=None)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
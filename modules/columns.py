@@ -0,0 +1,47 @@
+import re
+
+REQUIRED_COLUMNS = ['image url', 'saves', 'created date']
+
+# Названия столбцов в разных выгрузках (после приведения к нижнему регистру)
+COLUMN_ALIASES = {
+    'image url': [
+        'image url', 'image', 'image link', 'image src', 'img url', 'pin image', 'pin image url',
+        'изображение', 'картинка', 'ссылка на изображение'
+    ],
+    'saves': ['saves', 'save count', 'saves count', 'repins', 'repin count', 'сохранения', 'сохранений'],
+    'created date': [
+        'created date', 'created at', 'created', 'date created', 'creation date', 'pin created',
+        'дата создания', 'дата'
+    ],
+}
+_ALIASES = {alias: column for column, aliases in COLUMN_ALIASES.items() for alias in aliases}
+
+
+def canonical_column(name):
+    """Стандартное имя столбца планировщика или None для лишних столбцов"""
+    key = re.sub(r'[\s_\-]+', ' ', str(name)).strip().lower()
+    return _ALIASES.get(key)
+
+
+def column_mapping(names):
+    """{исходное имя: стандартное} для столбцов выгрузки.
+
+    Если под одно имя подходят несколько столбцов, берется первый.
+    """
+    mapping = {}
+    for name in names:
+        canonical = canonical_column(name)
+        if canonical and canonical not in mapping.values():
+            mapping[name] = canonical
+    return mapping
+
+
+def normalize_columns(df):
+    """Оставляет только нужные столбцы под стандартными именами.
+
+    Возвращает None, если какого-то столбца нет (например, лист со сводкой).
+    """
+    mapping = column_mapping(df.columns)
+    if set(mapping.values()) != set(REQUIRED_COLUMNS):
+        return None
+    return df[list(mapping)].rename(columns=mapping)[REQUIRED_COLUMNS]
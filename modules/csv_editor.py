@@ -1,8 +1,8 @@
-import pandas as pd
 import os
 import tkinter as tk
 from tkinter import ttk, messagebox  # Добавлен импорт ttk
 from pandastable import Table, TableModel
+from modules.input_cache import read_table
 from modules.utils import bind_paste_shortcut, handle_hotkeys
 
 
@@ -52,11 +52,8 @@ class CSVEditor:
         table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
         try:
-            # Чтение файла
-            if self.file_path.endswith('.csv'):
-                self.df = pd.read_csv(self.file_path)
-            else:
-                self.df = pd.read_excel(self.file_path)
+            # Чтение файла (Excel - через кэш)
+            self.df = read_table(self.file_path)
 
             # Проверка обязательных колонок
             required_columns = ['date', 'text', 'link', 'image1']
@@ -101,10 +98,7 @@ class CSVEditor:
     def refresh_table(self):
         """Обновляет таблицу из файла"""
         try:
-            if self.file_path.endswith('.csv'):
-                self.df = pd.read_csv(self.file_path)
-            else:
-                self.df = pd.read_excel(self.file_path)
+            self.df = read_table(self.file_path)
 
             # Проверка обязательных колонок
             required_columns = ['date', 'text', 'link', 'image1']
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMATS = [
+    '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y',
+    '%Y.%m.%d', '%Y/%m/%d', '%Y-%m-%d',
+    '%d.%m.%y', '%d/%m/%y', '%d-%m-%y',
+    '%d %b %Y', '%d %B %Y',
+    'ISO8601'
+]
+
+SAMPLE_SIZE = 200
+
+
+def parse_date(date_str):
+    """Дата начала из поля ввода: ДД.ММ.ГГГГ или ДДММГГГГ, иначе сегодня"""
+    try:
+        return datetime.strptime(date_str, "%d.%m.%Y").date()
+    except ValueError:
+        try:
+            return datetime.strptime(date_str, "%d%m%Y").date()
+        except ValueError:
+            return datetime.now().date()
+
+
+def _parse(values, fmt):
+    return pd.to_datetime(values, format=fmt, errors='coerce', utc=True)
+
+
+def rank_formats(values, formats=DATE_FORMATS, sample_size=SAMPLE_SIZE):
+    """Упорядочивает форматы по числу успешно разобранных значений выборки"""
+    if len(values) > sample_size:
+        step = len(values) // sample_size
+        sample = values[::step][:sample_size]
+    else:
+        sample = values
+
+    scores = []
+    for position, fmt in enumerate(formats):
+        hits = int(_parse(sample, fmt).notna().sum())
+        if hits:
+            # При равенстве сохраняется порядок списка (день раньше месяца)
+            scores.append((-hits, position, fmt))
+    return [fmt for _, _, fmt in sorted(scores)]
+
+
+def parse_unique(values):
+    """Разбирает массив уникальных строк, каждую ровно один раз.
+
+    Форматы пробуются в порядке, выведенном из выборки; к следующему
+    формату переходят только неразобранные значения. Остаток разбирается
+    универсальным парсером pandas.
+    """
+    result = pd.Series(pd.NaT, index=range(len(values)), dtype='datetime64[ns, UTC]')
+    pending = np.arange(len(values))
+
+    for fmt in rank_formats(values):
+        if not len(pending):
+            break
+        parsed = _parse(values[pending], fmt)
+        ok = parsed.notna()
+        result.iloc[pending[ok]] = parsed[ok]
+        pending = pending[~ok]
+
+    if len(pending):
+        parsed = pd.to_datetime(values[pending], format='mixed', dayfirst=True, errors='coerce', utc=True)
+        ok = parsed.notna()
+        result.iloc[pending[ok]] = parsed[ok]
+
+    return result
+
+
+def parse_dates(series):
+    """Преобразует столбец дат в datetime64 без часового пояса.
+
+    Значения дедуплицируются через factorize, уникальные разбираются
+    один раз и раскладываются обратно векторным take. Значения с часовым
+    поясом приводятся к UTC на уровне всего столбца. Неразобранные даты
+    возвращаются как NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, 'tz', None) is not None:
+            return series.dt.tz_convert(None)
+        return series
+
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques, dtype=object)
+
+    is_text = np.array([isinstance(value, str) for value in uniques], dtype=bool)
+    parsed = pd.Series(pd.NaT, index=range(len(uniques)), dtype='datetime64[ns, UTC]')
+    if is_text.any():
+        text_values = np.array([value.strip() for value in uniques[is_text]], dtype=object)
+        parsed.iloc[np.flatnonzero(is_text)] = parse_unique(text_values).to_numpy()
+    if (~is_text).any():
+        # Excel отдает готовые datetime/числа - их разбирает pandas
+        parsed.iloc[np.flatnonzero(~is_text)] = pd.to_datetime(
+            pd.Series(uniques[~is_text]), errors='coerce', utc=True
+        ).to_numpy()
+
+    # Последний элемент - NaT для пропусков (код -1)
+    lookup = np.append(parsed.dt.tz_convert(None).to_numpy(), np.datetime64('NaT'))
+    return pd.Series(lookup.take(codes), index=series.index, name=series.name)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+DEDUPE_COLUMNS = ['text', 'link', 'image1']
+
+
+class DuplicateReport:
+    """Группы дубликатов по столбцам расписания.
+
+    repeats[column] - позиции всех повторов, кроме первого вхождения;
+    группы целиком доступны через groups(column).
+    """
+
+    def __init__(self, grouped, repeats):
+        self._grouped = grouped
+        self.repeats = repeats
+
+    @property
+    def has_duplicates(self):
+        return any(len(positions) for positions in self.repeats.values())
+
+    def groups(self, column):
+        """Список массивов позиций строк с одинаковым значением"""
+        order, starts = self._grouped[column]
+        return np.split(order, starts[1:]) if len(order) else []
+
+    def summary(self):
+        parts = [f"{column}: {len(positions)}" for column, positions in self.repeats.items() if len(positions)]
+        return "Дубликаты - " + ", ".join(parts) if parts else "Дубликатов нет"
+
+
+def _column_groups(values):
+    """Повторы одного столбца за один проход хэш-таблицы factorize"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    duplicated = np.flatnonzero(counts[codes] > 1)
+
+    # Сортировка только строк-дубликатов, а не всего столбца
+    order = duplicated[np.argsort(codes[duplicated], kind='stable')]
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = codes[order[1:]] != codes[order[:-1]]
+    repeats = np.sort(order[~is_first])
+    return (order, np.flatnonzero(is_first)), repeats
+
+
+def find_duplicates(df, columns=DEDUPE_COLUMNS):
+    """Находит дубликаты за один проход по каждому столбцу"""
+    grouped = {}
+    repeats = {}
+    for column in columns:
+        if column in df.columns:
+            grouped[column], repeats[column] = _column_groups(df[column])
+    return DuplicateReport(grouped, repeats)
+
+
+def repair_duplicates(df, report, link_factory, text_factory):
+    """Исправляет дубликаты расписания.
+
+    Повторы изображений удаляются, повторяющиеся ссылки получают новые
+    номера после существующих, тексты перегенерируются только для
+    повторов. link_factory(count, offset) и text_factory(count, offset)
+    возвращают списки новых значений с нумерацией, сдвинутой на offset.
+    """
+    df = df.copy()
+    next_number = len(df)
+    image_repeats = report.repeats.get('image1', [])
+    if len(image_repeats):
+        keep = np.ones(len(df), dtype=bool)
+        keep[image_repeats] = False
+        df = df[keep].reset_index(drop=True)
+        report = find_duplicates(df)
+
+    link_repeats = report.repeats.get('link', [])
+    if len(link_repeats):
+        df.loc[link_repeats, 'link'] = link_factory(len(link_repeats), next_number)
+        next_number += len(link_repeats)
+
+    text_repeats = report.repeats.get('text', [])
+    if len(text_repeats):
+        df.loc[text_repeats, 'text'] = text_factory(len(text_repeats), next_number)
+        # Если генератор снова вернул занятые тексты, добавляем номер
+        still = find_duplicates(df, ['text']).repeats['text']
+        if len(still):
+            df.loc[still, 'text'] = [f"{text} #{next_number + i}" for i, text in enumerate(df.loc[still, 'text'])]
+
+    return df
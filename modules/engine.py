@@ -0,0 +1,678 @@
+import os
+from dataclasses import dataclass, asdict, fields, replace
+from datetime import datetime, timedelta, time as dt_time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from config import DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL, DEFAULT_DATE_FORMAT
+from modules.columns import REQUIRED_COLUMNS, canonical_column, column_mapping, normalize_columns
+from modules.dates import parse_date, parse_dates
+from modules.dedupe import find_duplicates, repair_duplicates
+from modules.input_cache import read_table
+from modules.posted_index import ImageSet, PostedIndex, normalize_urls
+from modules.ranking import DEFAULT_SCORER, compute_scores, select_top
+from modules.writers import write_atomic, append_rows, read_columns, detect_format
+from modules.timing import StageTimer
+from modules.timeline import (
+    make_rng, build_timeline, build_calendar_timeline, format_timeline, parse_posting_windows,
+    DATE_FORMAT, TIME_FORMAT
+)
+
+try:
+    import pyarrow  # noqa: F401
+    URL_DTYPE = 'string[pyarrow]'
+except ImportError:
+    URL_DTYPE = None
+
+OUTPUT_COLUMNS = ['date', 'text', 'link', 'image1']
+OUTPUT_DATE_FORMAT = f"{DATE_FORMAT} {TIME_FORMAT}"
+PREVIEW_ROWS = 20
+
+
+class PlannerError(Exception):
+    """Ошибка планирования, которую нужно показать пользователю"""
+
+    def __init__(self, title, message, status, level="error"):
+        super().__init__(message)
+        self.title = title
+        self.message = message
+        self.status = status
+        self.level = level
+
+    def __reduce__(self):
+        # Нужно для передачи ошибки из процессов CLI
+        return self.__class__, (self.title, self.message, self.status, self.level)
+
+
+@dataclass
+class PlannerConfig:
+    """Параметры планировщика без привязки к интерфейсу"""
+    start_date: str = ""
+    start_time: str = "12:00"
+    min_interval: int = DEFAULT_MIN_INTERVAL
+    max_interval: int = DEFAULT_MAX_INTERVAL
+    post_limit: Optional[int] = None
+    min_saves: Optional[float] = None
+    sort_by_saves_only: bool = False
+    shuffle: bool = True
+    base_text: str = ""
+    base_link: str = ""
+    link_template: Optional[str] = None
+    text_template: Optional[str] = None
+    streaming: bool = False
+    chunk_size: int = 200_000
+    seed: Optional[int] = None
+    posting_windows: Optional[dict] = None
+    blackout_dates: Optional[list] = None
+    daily_cap: Optional[int] = None
+    number_start: int = 101
+    append: bool = False
+    posted_index: Optional[str] = None
+    # Публикации, уже стоящие в расписании по дням ('ДД.ММ.ГГГГ': число) - для лимита в день
+    posts_per_day: Optional[dict] = None
+    ranking: str = DEFAULT_SCORER
+    ranking_params: Optional[dict] = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Создает конфигурацию из словаря, игнорируя неизвестные ключи"""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def is_text_column(name):
+    """Столбцы, которые читаются как текст: ссылки и даты (даты разбирает планировщик)"""
+    return canonical_column(name) in ('image url', 'created date')
+
+
+def read_input(file_path):
+    """Читает из входного CSV/Excel файла только нужные планировщику столбцы.
+
+    Столбцы выгрузок с другими названиями (Image URL, Repins, Created at...)
+    приводятся к стандартным; если какого-то нет, таблица возвращается
+    как есть, и validate_columns сообщит, чего не хватает.
+    """
+    df = read_table(file_path, canonical_column, string_columns=is_text_column)
+    normalized = normalize_columns(df)
+    return df if normalized is None else normalized
+
+
+def validate_columns(df):
+    """Проверяет наличие обязательных столбцов"""
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise PlannerError(
+            "Ошибка",
+            f"В файле отсутствуют обязательные столбцы:\n\n{', '.join(missing_columns)}\n\n"
+            f"Доступные столбцы: {', '.join(map(str, df.columns))}",
+            "Ошибка: отсутствуют столбцы"
+        )
+
+
+def normalize_created_dates(date_series):
+    """Преобразует столбец created date в datetime без часового пояса"""
+    converted_dates = parse_dates(date_series)
+    mask = converted_dates.isnull()
+
+    # Проверка на некорректные даты
+    if mask.any():
+        invalid_samples = date_series[mask].head(5).tolist()
+        raise PlannerError(
+            "Ошибка формата даты",
+            f"Найдены {mask.sum()} некорректных дат в столбце created date.\n"
+            f"Примеры некорректных значений:\n{invalid_samples}\n\n"
+            "Убедитесь, что все даты в одном из форматов:\n"
+            "ДД.ММ.ГГГГ, ДД/ММ/ГГГГ, ДД-ММ-ГГГГ, ГГГГ.ММ.ДД",
+            "Ошибка: неверный формат даты"
+        )
+
+    return converted_dates
+
+
+def compact_frame(df):
+    """Приводит столбцы к компактным типам.
+
+    saves хранится как int32 (float32 при пропусках), ссылки - строками
+    Arrow вместо объектов Python, если установлен pyarrow.
+    """
+    saves = df['saves']
+    if not pd.api.types.is_numeric_dtype(saves):
+        converted = pd.to_numeric(saves, errors='coerce')
+        invalid = converted.isna() & saves.notna()
+        if invalid.any():
+            raise PlannerError(
+                "Ошибка формата данных",
+                f"Найдены {invalid.sum()} нечисловых значений в столбце saves.\n"
+                f"Примеры некорректных значений:\n{saves[invalid].head(5).tolist()}",
+                "Ошибка: неверный формат saves"
+            )
+        saves = converted
+
+    int32 = np.iinfo(np.int32)
+    if saves.notna().all() and (saves % 1 == 0).all() and saves.between(int32.min, int32.max).all():
+        df['saves'] = saves.astype(np.int32)
+    else:
+        df['saves'] = saves.astype(np.float32)
+
+    if URL_DTYPE and pd.api.types.is_object_dtype(df['image url']):
+        df['image url'] = df['image url'].astype(URL_DTYPE)
+    return df
+
+
+def scorer_name(config):
+    """Формула ранжирования с учетом флага сортировки только по сохранениям"""
+    return 'saves' if config.sort_by_saves_only else config.ranking
+
+
+def add_score(df, config, current_time):
+    """Добавляет столбец score (float32) с оценкой выбранной формулой"""
+    try:
+        df['score'] = compute_scores(
+            df['saves'].to_numpy(), df['created date'].to_numpy(), current_time,
+            scorer_name(config), config.ranking_params
+        ).astype(np.float32)
+    except ValueError as e:
+        raise PlannerError("Ошибка ранжирования", str(e), "Ошибка: неизвестная формула")
+    return df
+
+
+def select_unique_top(urls, scores, limit=None):
+    """Позиции лучших limit строк по убыванию оценки без повторов изображений.
+
+    Из повторов остается строка с лучшей оценкой. Ссылки сравниваются
+    в нормализованном виде, как в индексе истории, поэтому
+    размерные варианты одной картинки pinimg - повторы. Повторы ищутся
+    только среди отобранных лучших строк; если после их удаления строк
+    меньше limit, отбор расширяется вдвое.
+    """
+    count = len(scores)
+    size = limit
+    while True:
+        order = select_top(scores, size if size is not None and size < count else None)
+        order = order[~normalize_urls(urls.take(order)).duplicated().to_numpy()]
+        if limit is None or len(order) >= limit or size >= count:
+            return order[:limit]
+        size *= 2
+
+
+def take_top(df, limit=None):
+    """Упорядочивает строки по score; с лимитом сортируются только лучшие limit.
+
+    Из повторов одного изображения остается строка с лучшей оценкой.
+    """
+    return df.iloc[select_unique_top(df['image url'], df['score'].to_numpy(), limit)]
+
+
+def rank_positions(df, config, current_time):
+    """Позиции прошедших фильтр min_saves строк по убыванию оценки.
+
+    Фильтр и ранжирование работают с массивами позиций, сама таблица
+    не копируется. Повторы одного изображения отбрасываются до лимита
+    (остается лучшая оценка), чтобы нумерация текстов и ссылок шла
+    без пропусков и AI не генерировал тексты для выброшенных строк.
+    """
+    scores = add_score(df, config, current_time)['score'].to_numpy()
+    limit = int(config.post_limit) if config.post_limit is not None else None
+    if config.min_saves is None:
+        return select_unique_top(df['image url'], scores, limit)
+    candidates = np.flatnonzero(df['saves'].to_numpy() >= config.min_saves)
+    return candidates[select_unique_top(df['image url'].take(candidates), scores[candidates], limit)]
+
+
+def rank_and_filter(df, config, current_time=None):
+    """Фильтрует записи по сохранениям и ранжирует по выбранной формуле.
+
+    Строки результата выбираются одной операцией take.
+    """
+    if current_time is None:
+        current_time = datetime.now()
+    return df.take(rank_positions(df, config, current_time))
+
+
+def generate_links(config, count):
+    """Генерирует уникальные ссылки для постов"""
+    base_link = config.base_link.rstrip('/')
+    start = config.number_start
+    if config.link_template:
+        return [f"{base_link}{config.link_template.replace('{num}', str(start + i))}" for i in range(count)]
+    return [f"{base_link}/?{start + i}" for i in range(count)]
+
+
+def generate_texts(config, count, progress_callback=None):
+    """Генерирует тексты без AI: по шаблону или с нумерацией"""
+    start = config.number_start
+    if config.text_template:
+        return [config.text_template.replace('{num}', str(start + i)) for i in range(count)]
+
+    texts = [f"{config.base_text} #{start + i}" for i in range(count)]
+    if progress_callback:
+        progress_callback(count, count)
+    return texts
+
+
+def start_datetime_for(config):
+    """Возвращает дату и время первой публикации"""
+    start_date = parse_date(config.start_date)
+    try:
+        start_hour, start_minute = map(int, config.start_time.split(':'))
+        return datetime.combine(start_date, dt_time(start_hour, start_minute))
+    except Exception:
+        return datetime.combine(start_date, dt_time(12, 0))
+
+
+def daily_cap_for(config):
+    """Лимит публикаций в день из конфигурации или None, если он не задан"""
+    cap = config.daily_cap
+    if cap is None:
+        return None
+    try:
+        valid = float(cap) >= 1 and float(cap).is_integer()
+    except (TypeError, ValueError):
+        valid = False
+    if not valid:
+        raise PlannerError(
+            "Ошибка расписания",
+            f"Лимит публикаций в день должен быть целым числом не меньше 1, указано: {cap}",
+            "Ошибка: неверный лимит в день"
+        )
+    return int(cap)
+
+
+def schedule_timeline(config, count, rng, start=None, reserved=None):
+    """Строит даты публикаций: по окнам и лимиту в день, если они заданы.
+
+    Публикации из config.posts_per_day (при дописывании) засчитываются
+    в лимит своего дня; минуты из reserved (слоты других аккаунтов)
+    не занимаются.
+    """
+    if start is None:
+        start = start_datetime_for(config)
+    daily_cap = daily_cap_for(config)
+    if not (config.posting_windows or config.blackout_dates or daily_cap or reserved is not None):
+        return build_timeline(start, count, config.min_interval, config.max_interval, rng)
+
+    try:
+        windows = parse_posting_windows(config.posting_windows) if config.posting_windows else None
+        blackout = {datetime.strptime(d.strip(), DEFAULT_DATE_FORMAT).date() for d in config.blackout_dates or []}
+        day_counts = {
+            datetime.strptime(day, DATE_FORMAT).date(): int(posts)
+            for day, posts in (config.posts_per_day or {}).items()
+        }
+        return build_calendar_timeline(
+            start, count, config.min_interval, config.max_interval,
+            posting_windows=windows,
+            blackout_dates=blackout,
+            daily_cap=daily_cap,
+            rng=rng,
+            day_counts=day_counts,
+            reserved=reserved
+        )
+    except ValueError as e:
+        raise PlannerError(
+            "Ошибка расписания",
+            f"Некорректные окна публикаций или даты-исключения:\n\n{e}\n\n"
+            "Окна задаются как 09:00-12:00, 18:00-22:00, даты - ДД.ММ.ГГГГ",
+            "Ошибка: неверные окна публикаций"
+        )
+
+
+def stream_top_k(file_path, config, current_time=None, status_callback=None, exclude_images=None, timer=None):
+    """Читает CSV частями и оставляет только лучшие post_limit записей.
+
+    Каждая часть фильтруется по min_saves и объединяется с текущими
+    лидерами через частичный отбор select_top, поэтому память зависит
+    от размера части и post_limit, а не от размера файла.
+    """
+    if current_time is None:
+        current_time = datetime.now()
+    timer = timer or StageTimer()
+
+    # Столбцы с другими названиями приводятся к стандартным, как в read_input
+    header = pd.read_csv(file_path, nrows=0)
+    mapping = column_mapping(header.columns)
+    validate_columns(header.rename(columns=mapping))
+    limit = int(config.post_limit) if config.post_limit is not None else None
+
+    parts = []
+    kept = 0
+    rows_read = 0
+    rows_dated = 0
+    reader = pd.read_csv(file_path, usecols=list(mapping), chunksize=config.chunk_size)
+    while True:
+        with timer.stage('read'):
+            chunk = next(reader, None)
+            if chunk is not None:
+                rows_read += len(chunk)
+                chunk = compact_frame(chunk.rename(columns=mapping)[REQUIRED_COLUMNS])
+                if config.min_saves is not None:
+                    chunk = chunk[chunk['saves'] >= config.min_saves]
+                chunk = drop_excluded(chunk, exclude_images)
+        if chunk is None:
+            break
+        timer.set_rows('read', rows_read)
+        if chunk.empty:
+            continue
+
+        with timer.stage('dates'):
+            chunk = chunk.copy()
+            chunk['created date'] = normalize_created_dates(chunk['created date'])
+        rows_dated += len(chunk)
+        timer.set_rows('dates', rows_dated)
+        with timer.stage('ranking'):
+            parts.append(add_score(chunk, config, current_time))
+            kept += len(chunk)
+
+            # Без лимита оставляем все прошедшие фильтр строки
+            if limit is not None and kept > limit:
+                parts = [take_top(pd.concat(parts, ignore_index=True), limit)]
+                kept = len(parts[0])
+
+        if status_callback:
+            status_callback(f"Потоковое чтение: {rows_read} строк, отобрано {kept}")
+
+    if not parts:
+        return pd.DataFrame(columns=REQUIRED_COLUMNS)
+
+    with timer.stage('ranking'):
+        result = take_top(pd.concat(parts, ignore_index=True), limit).reset_index(drop=True)
+    timer.set_rows('ranking', len(result))
+    return result
+
+
+def use_streaming(source, config):
+    """Потоковый режим возможен только для CSV при включенном лимите или фильтре"""
+    return (
+        config.streaming
+        and isinstance(source, str)
+        and source.endswith('.csv')
+        and (config.post_limit is not None or config.min_saves is not None)
+    )
+
+
+def drop_excluded(df, exclude_images):
+    """Отбрасывает строки, изображения которых есть в одном из наборов"""
+    if not exclude_images:
+        return df
+    mask = np.zeros(len(df), dtype=bool)
+    for image_set in exclude_images:
+        mask |= image_set.contains(df['image url'])
+    return df[~mask] if mask.any() else df
+
+
+def excluded_sets(config, exclude_images=None):
+    """Наборы изображений для исключения: переданные и история публикаций"""
+    sets = list(exclude_images or [])
+    if config.posted_index:
+        sets.append(PostedIndex(config.posted_index))
+    return sets
+
+
+def load_ranked(source, config, status_callback=None, exclude_images=None, timer=None):
+    """Читает источник, разбирает даты, ранжирует и фильтрует записи.
+
+    exclude_images - список наборов ImageSet с уже запланированными
+    изображениями; вместе с индексом истории (config.posted_index) они
+    отбрасываются одной векторной проверкой до ранжирования и лимита.
+    timer - StageTimer для замеров этапов.
+    """
+    def report(message):
+        if status_callback:
+            status_callback(message)
+
+    timer = timer or StageTimer()
+    exclude_images = excluded_sets(config, exclude_images)
+    if use_streaming(source, config):
+        report("Потоковое чтение файла...")
+        df = stream_top_k(source, config, status_callback=status_callback, exclude_images=exclude_images,
+                          timer=timer)
+    else:
+        report("Чтение файла...")
+        with timer.stage('read'):
+            df = read_input(source) if isinstance(source, str) else source
+            validate_columns(df)
+            if df is source:
+                # Чужую таблицу не меняем, лишние столбцы не копируем
+                df = df[REQUIRED_COLUMNS].copy()
+            # Прочитанные строки считаются до фильтров, как при потоковом чтении
+            rows_read = len(df)
+            df = drop_excluded(compact_frame(df), exclude_images)
+        timer.set_rows('read', rows_read)
+
+        report("Обработка дат...")
+        with timer.stage('dates', rows=len(df)):
+            df['created date'] = normalize_created_dates(df['created date'])
+        with timer.stage('ranking'):
+            df = rank_and_filter(df, config)
+        timer.set_rows('ranking', len(df))
+
+    if df.empty:
+        raise PlannerError(
+            "Предупреждение",
+            "Нет данных для генерации расписания.",
+            "Нет данных",
+            level="warning"
+        )
+    return df
+
+
+def fix_duplicates(df_output, config, text_generator=None, status_callback=None):
+    """Находит дубликаты текстов, ссылок и изображений и исправляет их"""
+    report = find_duplicates(df_output)
+    if not report.has_duplicates:
+        return df_output
+
+    if status_callback:
+        status_callback(f"Исправление: {report.summary()}")
+
+    def make_links(count, offset):
+        return generate_links(replace(config, number_start=config.number_start + offset), count)
+
+    def make_texts(count, offset):
+        number_start = config.number_start + offset
+        if text_generator is None:
+            return generate_texts(replace(config, number_start=number_start), count)
+        return text_generator(config.base_text, count, None, number_start)
+
+    return repair_duplicates(df_output, report, make_links, make_texts)
+
+
+def build_schedule(df, config, text_generator=None, progress_callback=None, status_callback=None,
+                   start_datetime=None, timer=None):
+    """Строит расписание по ранжированным записям.
+
+    Столбец date возвращается как datetime64, форматирование для CSV
+    выполняет format_schedule. start_datetime переопределяет начало
+    расписания (используется при дописывании).
+    """
+    timer = timer or StageTimer()
+    if status_callback:
+        status_callback("Генерация текстов...")
+    count = len(df)
+    with timer.stage('texts', rows=count):
+        if text_generator is None:
+            texts = generate_texts(config, count, progress_callback)
+        else:
+            texts = text_generator(config.base_text, count, progress_callback, config.number_start)
+
+    with timer.stage('links', rows=count):
+        df_output = pd.DataFrame({
+            'text': texts,
+            'link': generate_links(config, count),
+            'image1': df['image url'].to_numpy()
+        })
+    with timer.stage('dedupe'):
+        df_output = fix_duplicates(df_output, config, text_generator, status_callback)
+    timer.set_rows('dedupe', len(df_output))
+
+    with timer.stage('timeline', rows=len(df_output)):
+        rng = make_rng(config.seed)
+        if config.shuffle:
+            # Тот же порядок, что дает sample(frac=1) с этим генератором
+            order = rng.choice(len(df_output), size=len(df_output), replace=False)
+            df_output = df_output.take(order).reset_index(drop=True)
+
+        df_output['date'] = schedule_timeline(config, len(df_output), rng, start_datetime)
+    return df_output[OUTPUT_COLUMNS]
+
+
+def format_schedule(df_output):
+    """Переводит столбец date в текстовый формат Pinterest"""
+    df_output['date'] = format_timeline(pd.DatetimeIndex(df_output['date']))
+    return df_output
+
+
+def plan(source, config, text_generator=None, progress_callback=None, status_callback=None, timer=None):
+    """Строит расписание публикаций.
+
+    source - путь к CSV/Excel файлу или готовый DataFrame.
+    text_generator(base_text, count, progress_callback, number_start) - генератор текстов,
+    по умолчанию тексты строятся по шаблону без AI.
+    Возвращает DataFrame со столбцами date, text, link, image1.
+    timer - StageTimer, в который записываются замеры этапов.
+    """
+    timer = timer or StageTimer()
+    df = load_ranked(source, config, status_callback, timer=timer)
+    df_output = build_schedule(df, config, text_generator, progress_callback, status_callback, timer=timer)
+    with timer.stage('format', rows=len(df_output)):
+        return format_schedule(df_output)
+
+
+def posts_on_day(dates, last_datetime):
+    """Сколько публикаций расписания приходится на день последней публикации"""
+    if last_datetime is None:
+        return None
+    day = last_datetime.strftime(DATE_FORMAT)
+    return {day: int(dates.astype(str).str.startswith(day).sum())}
+
+
+def read_schedule_tail(output_path):
+    """Возвращает дату последней публикации, число строк, уже запланированные
+    изображения и число публикаций в день последней публикации.
+
+    Файл любого формата читается по двум столбцам, date и image1; дата
+    последней публикации берется из последней строки. Если ее не удается
+    разобрать, расписание продолжается с даты начала из настроек.
+    """
+    existing = read_columns(output_path, ['date', 'image1'])
+    last_datetime = None
+    if len(existing):
+        try:
+            last_datetime = datetime.strptime(str(existing['date'].iloc[-1]), OUTPUT_DATE_FORMAT)
+        except ValueError:
+            last_datetime = None
+    return (last_datetime, len(existing), ImageSet.from_urls(existing['image1'].dropna()),
+            posts_on_day(existing['date'], last_datetime))
+
+
+def scheduled_texts(config, output_path):
+    """Тексты, уже стоящие в дописываемом расписании (пусто без дописывания)"""
+    if not (config.append and output_path and os.path.exists(output_path) and os.path.getsize(output_path) > 0):
+        return set()
+    return set(read_columns(output_path, ['text'])['text'].dropna().astype(str))
+
+
+def append_context(config, output_path):
+    """Параметры продолжения существующего расписания.
+
+    Возвращает конфигурацию с продолженной нумерацией и числом уже
+    стоящих публикаций в последний день (для лимита в день), время
+    первой новой публикации (None для пустого файла) и набор уже
+    запланированных изображений.
+    """
+    last_datetime, row_count, scheduled, posts_per_day = read_schedule_tail(output_path)
+    config = replace(config, number_start=config.number_start + row_count, posts_per_day=posts_per_day)
+    start = None
+    if last_datetime is not None:
+        gap = int(make_rng(config.seed).integers(config.min_interval, config.max_interval, endpoint=True))
+        start = last_datetime + timedelta(minutes=gap)
+    return config, start, scheduled
+
+
+def plan_append(source, config, output_path, text_generator=None, progress_callback=None, status_callback=None,
+                timer=None):
+    """Строит продолжение существующего расписания.
+
+    Нумерация ссылок и текстов продолжается с номера после последней
+    строки, время - после последней публикации, а изображения, которые
+    уже есть в расписании, пропускаются. Тексты генерируются только для
+    новых строк.
+    """
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return plan(source, config, text_generator, progress_callback, status_callback, timer)
+
+    timer = timer or StageTimer()
+    df, config, start = load_for_schedule(source, config, output_path, status_callback, timer)
+    df_output = build_schedule(df, config, text_generator, progress_callback, status_callback, start, timer)
+    with timer.stage('format', rows=len(df_output)):
+        return format_schedule(df_output)
+
+
+def load_for_schedule(source, config, output_path=None, status_callback=None, timer=None):
+    """Загружает записи для расписания с учетом режима дописывания.
+
+    Если config.append и файл output_path не пуст, исключаются уже
+    запланированные изображения, а нумерация и время продолжаются.
+    Возвращает ранжированные записи, итоговую конфигурацию и время
+    начала (None - по настройкам).
+    """
+    timer = timer or StageTimer()
+    start = None
+    exclude_images = None
+    if config.append and output_path and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if status_callback:
+            status_callback("Чтение существующего расписания...")
+        with timer.stage('read'):
+            config, start, scheduled = append_context(config, output_path)
+        exclude_images = [scheduled]
+    df = load_ranked(source, config, status_callback, exclude_images=exclude_images, timer=timer)
+    return df, config, start
+
+
+@dataclass
+class PlanPreview:
+    """Результат предпросмотра расписания"""
+    rows: pd.DataFrame
+    read_rows: Optional[int]
+    planned_rows: int
+    start: datetime
+    end: datetime
+
+
+def preview(source, config, rows=PREVIEW_ROWS, output_path=None, status_callback=None, timer=None):
+    """Быстрый предпросмотр расписания без обращений к AI.
+
+    Проходит те же этапы, что и plan (и plan_append при config.append),
+    но тексты строятся по шаблону, а в текстовый формат переводятся
+    только первые rows строк. Расписание не записывается.
+    """
+    timer = timer or StageTimer()
+    df, config, start = load_for_schedule(source, config, output_path, status_callback, timer)
+    df_output = build_schedule(df, config, None, None, status_callback, start, timer)
+
+    dates = pd.DatetimeIndex(df_output['date'])
+    with timer.stage('format', rows=min(rows, len(df_output))):
+        head = format_schedule(df_output.head(rows).copy())
+    return PlanPreview(head, timer.stages.get('read', {}).get('rows'), len(df_output), dates.min(), dates.max())
+
+
+def record_posted(df_output, config):
+    """Запоминает изображения записанного расписания в индексе истории"""
+    if config.posted_index:
+        PostedIndex(config.posted_index).add(df_output['image1'])
+
+
+def write_schedule(df_output, output_path, append=False):
+    """Сохраняет расписание; формат (CSV, CSV.GZ, Parquet, JSONL) - по расширению.
+
+    Новый файл пишется атомарно через временный файл, при append
+    строки дописываются в конец существующего.
+    """
+    if append and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        append_rows(df_output[OUTPUT_COLUMNS], output_path)
+    else:
+        write_atomic(df_output[OUTPUT_COLUMNS], output_path)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from config import INPUT_CACHE_DIR, INPUT_CACHE_MAX_MB
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pa_csv = pq = None
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """Хэш содержимого файла, читается блоками"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _entry_stem(file_path, cache_dir):
+    """Общая часть имен записей кэша: ключ из пути, mtime, размера и содержимого"""
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    path_key = _digest(abs_path.encode('utf-8'))
+    version_key = _digest(f"{stat.st_mtime_ns}:{stat.st_size}:{file_hash(abs_path)}".encode('utf-8'))
+    return os.path.join(cache_dir, f"{path_key}_{version_key}")
+
+
+def cache_entry_path(file_path, cache_dir=INPUT_CACHE_DIR):
+    """Путь к файлу кэша первого листа"""
+    return _entry_stem(file_path, cache_dir) + ".parquet"
+
+
+def _drop_old_versions(entry_path):
+    """Удаляет кэш прошлых версий того же файла (записи текущей версии остаются)"""
+    cache_dir = os.path.dirname(entry_path)
+    path_key, version_key = os.path.basename(entry_path).split('.')[0].split('_')[:2]
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith(path_key + '_') and not name.startswith(f"{path_key}_{version_key}"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def evict(cache_dir=INPUT_CACHE_DIR, max_bytes=INPUT_CACHE_MAX_MB * 1024 * 1024):
+    """Удаляет давно не использованные записи, пока кэш больше лимита"""
+    if not os.path.isdir(cache_dir):
+        return
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def select_columns(names, columns):
+    """Имена из names, подходящие под columns: список имен или условие columns(name)"""
+    if callable(columns):
+        return [name for name in names if columns(name)]
+    return [col for col in columns if col in names]
+
+
+def _matches(name, columns):
+    return columns(name) if callable(columns) else name in columns
+
+
+def _subset(df, columns):
+    return df if columns is None else df[select_columns(list(df.columns), columns)]
+
+
+def _read_parquet(entry_path, columns):
+    if columns is not None:
+        columns = select_columns(pq.read_schema(entry_path).names, columns)
+    return pd.read_parquet(entry_path, columns=columns)
+
+
+def _write_parquet(df, entry_path):
+    tmp_path = entry_path + '.tmp'
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, entry_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_excel_cached(file_path, columns=None, cache_dir=INPUT_CACHE_DIR):
+    """Читает Excel через колоночный кэш Parquet.
+
+    При первом чтении файл разбирается pd.read_excel и сохраняется в кэш,
+    последующие чтения берут только нужные столбцы из Parquet.
+    columns - список имен или условие columns(name). Без pyarrow кэш
+    отключается.
+    """
+    if pq is None:
+        return _subset(pd.read_excel(file_path), columns)
+
+    entry_path = cache_entry_path(file_path, cache_dir)
+    if os.path.exists(entry_path):
+        try:
+            os.utime(entry_path)
+            return _read_parquet(entry_path, columns)
+        except Exception:
+            # Поврежденная запись - перечитываем исходный файл
+            os.remove(entry_path)
+
+    df = pd.read_excel(file_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_parquet(df, entry_path)
+        _drop_old_versions(entry_path)
+        evict(cache_dir)
+    except Exception:
+        # Смешанные типы в столбцах не всегда сериализуются - работаем без кэша
+        pass
+
+    return _subset(df, columns)
+
+
+def read_excel_sheets_cached(file_path, columns=None, cache_dir=INPUT_CACHE_DIR):
+    """Читает все листы Excel через кэш Parquet, по записи на лист.
+
+    Список листов хранится в отдельной записи и пишется последним: если
+    какой-то лист не сохранился или вытеснен, книга разбирается заново.
+    Возвращает список таблиц в порядке листов.
+    """
+    if pq is None:
+        return [_subset(df, columns) for df in pd.read_excel(file_path, sheet_name=None).values()]
+
+    stem = _entry_stem(file_path, cache_dir)
+    manifest_path = stem + "_sheets.json"
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            paths = [f"{stem}_sheet{i}.parquet" for i in range(json.load(f)['sheets'])]
+        frames = [_read_parquet(path, columns) for path in paths]
+        for path in paths + [manifest_path]:
+            os.utime(path)
+        return frames
+    except Exception:
+        # Записи нет, она неполная или повреждена - перечитываем книгу
+        pass
+
+    sheets = list(pd.read_excel(file_path, sheet_name=None).values())
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for i, df in enumerate(sheets):
+            _write_parquet(df, f"{stem}_sheet{i}.parquet")
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'sheets': len(sheets)}, f)
+        _drop_old_versions(manifest_path)
+        evict(cache_dir)
+    except Exception:
+        pass
+
+    return [_subset(df, columns) for df in sheets]
+
+
+def _read_csv_arrow(file_path, columns, string_columns=()):
+    """Потоковое чтение CSV через pyarrow.
+
+    Файл разбирается блоками, в памяти остаются только нужные столбцы;
+    строки остаются в буферах Arrow без объектов Python.
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    include = [col for col in header if _matches(col, columns)]
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=include,
+        # Тип этих столбцов pyarrow не угадывает (например, даты разбирает планировщик)
+        column_types={col: pa.string() for col in include if _matches(col, string_columns)}
+    )
+    with pa_csv.open_csv(file_path, convert_options=convert_options) as reader:
+        table = reader.read_all()
+    return table.to_pandas(
+        types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get, self_destruct=True, split_blocks=True
+    )
+
+
+def read_csv_columns(file_path, columns=None, string_columns=()):
+    """Читает из CSV только нужные столбцы.
+
+    Если столбцы заданы и есть pyarrow, файл читается блоками его
+    парсером: это быстрее и требует меньше памяти. Если pyarrow не
+    справился с файлом, чтение повторяется парсером pandas.
+    """
+    if pa_csv is not None and columns is not None:
+        try:
+            return _read_csv_arrow(file_path, columns, string_columns)
+        except Exception:
+            pass
+    usecols = None if columns is None else (lambda col: _matches(col, columns))
+    return pd.read_csv(file_path, usecols=usecols)
+
+
+def read_table(file_path, columns=None, string_columns=()):
+    """Читает CSV напрямую, Excel - через кэш.
+
+    columns и string_columns - списки имен или условия name -> bool;
+    string_columns читаются из CSV как текст без угадывания типа.
+    """
+    if file_path.endswith('.csv'):
+        return read_csv_columns(file_path, columns, string_columns)
+    return read_excel_cached(file_path, columns)
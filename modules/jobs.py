@@ -0,0 +1,171 @@
+import itertools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Optional
+
+from modules.ai_settings import TextSettings
+from modules.engine import PlannerConfig, load_for_schedule
+from modules.merge import load_sources, split_inputs
+from modules.timing import StageTimer
+
+# Состояния задания
+PENDING = "В очереди"
+RUNNING = "Выполняется"
+DONE = "Готово"
+FAILED = "Ошибка"
+CANCELLED = "Отменено"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+@dataclass
+class PlannerJob:
+    """Задание очереди: пара вход/выход и снимок настроек на момент добавления.
+
+    config - параметры планировщика, ai - настройки генерации текстов.
+    """
+    job_id: int
+    input_path: str
+    output_path: str
+    config: PlannerConfig
+    ai: TextSettings = TextSettings()
+    state: str = PENDING
+    message: str = ""
+    progress: float = 0.0
+    details: Optional[str] = None
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    @property
+    def input_name(self):
+        """Имена входных файлов для отображения"""
+        return ", ".join(os.path.basename(path) for path in split_inputs(self.input_path))
+
+
+def rank_job(source, config, output_path=None):
+    """CPU-этап задания для отдельного процесса: чтение, даты, ранжирование.
+
+    Несколько выгрузок через точку с запятой сначала объединяются.
+    Для дописывания сначала читается существующее расписание. Возвращает
+    ранжированные записи, конфигурацию с продолженной нумерацией, время
+    начала (или None) и замеры этапов.
+    """
+    timer = StageTimer()
+    source = load_sources(source, timer=timer)
+    df, config, start = load_for_schedule(source, config, output_path, timer=timer)
+    return df, config, start, timer.stages
+
+
+class JobQueue:
+    """Очередь заданий планировщика с ограниченным пулом.
+
+    Одновременно выполняется не больше max_workers заданий: CPU-этапы
+    идут в пуле процессов, генерация текстов и запись - в потоке
+    задания. Завершенное задание освобождает место следующему.
+    runner(job, queue) выполняет задание и сообщает о ходе через
+    queue.report; on_update(job) вызывается при каждом изменении.
+    """
+
+    def __init__(self, runner, max_workers=2, on_update=None):
+        self.runner = runner
+        self.on_update = on_update
+        self.max_workers = max_workers
+        self.jobs = []
+        self._ids = itertools.count(1)
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="planner-job")
+        self._processes = None
+
+    def add(self, input_path, output_path, config, ai=None):
+        """Ставит задание в очередь и возвращает его.
+
+        config и ai - снимки настроек, собранные в потоке интерфейса.
+        """
+        job = PlannerJob(next(self._ids), input_path, output_path, config, ai or TextSettings())
+        with self._lock:
+            self.jobs.append(job)
+            self._futures[job.job_id] = self._threads.submit(self._run, job)
+        self._notify(job)
+        return job
+
+    def _run(self, job):
+        self.report(job, "Запуск...", 0.0, state=RUNNING)
+        try:
+            self.runner(job, self)
+        finally:
+            if not job.finished:
+                self.report(job, state=DONE)
+
+    def run_in_process(self, func, *args):
+        """Выполняет функцию в пуле процессов и ждет результата"""
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.max_workers)
+            pool = self._processes
+        try:
+            return pool.submit(func, *args).result()
+        except BrokenProcessPool:
+            # Упавший процесс ломает пул - следующее задание создаст новый
+            with self._lock:
+                if self._processes is pool:
+                    self._processes = None
+            raise
+
+    def report(self, job, message=None, progress=None, state=None, details=None):
+        """Обновляет строку задания"""
+        if message is not None:
+            job.message = message
+        if progress is not None:
+            job.progress = progress
+        if state is not None:
+            job.state = state
+        if details is not None:
+            job.details = details
+        self._notify(job)
+
+    def _notify(self, job):
+        if self.on_update:
+            self.on_update(job)
+
+    def cancel(self, job_id):
+        """Отменяет задание, которое еще ждет в очереди"""
+        with self._lock:
+            future = self._futures.get(job_id)
+            job = next((j for j in self.jobs if j.job_id == job_id), None)
+        if job is None or job.state != PENDING or not future.cancel():
+            return False
+        self.report(job, "", state=CANCELLED)
+        return True
+
+    def clear_finished(self):
+        """Убирает завершенные задания из списка, возвращает их номера"""
+        with self._lock:
+            removed = [job.job_id for job in self.jobs if job.finished]
+            self.jobs = [job for job in self.jobs if not job.finished]
+            for job_id in removed:
+                self._futures.pop(job_id, None)
+        return removed
+
+    def active_outputs(self):
+        """Файлы, в которые пишут незавершенные задания"""
+        with self._lock:
+            return {os.path.abspath(job.output_path) for job in self.jobs if not job.finished}
+
+    def get(self, job_id):
+        with self._lock:
+            return next((job for job in self.jobs if job.job_id == job_id), None)
+
+    def shutdown(self):
+        """Отменяет ожидающие задания; выполняющиеся завершаются"""
+        for job in list(self.jobs):
+            if job.state == PENDING:
+                self.cancel(job.job_id)
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
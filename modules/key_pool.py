@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+from config import KEY_COOLDOWN_SECONDS, KEY_MAX_WAIT_SECONDS
+from modules.rate_limit import RateLimiter
+
+# Паузы ключей общие для всех заданий процесса: ключ, упершийся в лимит
+# в одном задании, пропускают и соседние, и следующие запуски
+_cooldowns = {}
+_cooldowns_lock = threading.Lock()
+# Лимитеры тоже общие: (провайдер, ключ) -> RateLimiter. Два задания
+# в очереди делят RPM/TPM ключа, а не получают каждое по полному лимиту
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def pool_keys(selected, key_manager=None):
+    """Ключи пула: выбранный в интерфейсе первым, затем сохраненные"""
+    keys = [selected] + (list(key_manager.get_keys()) if key_manager else [])
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def shared_limiter(provider, key, requests_per_minute=None, tokens_per_minute=None):
+    """RateLimiter ключа, общий для всех заданий процесса.
+
+    Лимиты берутся из последних настроек: сменив их в интерфейсе, новое
+    задание меняет темп и для уже идущих.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get((provider, key))
+        if limiter is None:
+            limiter = _limiters[(provider, key)] = RateLimiter(requests_per_minute, tokens_per_minute)
+            return limiter
+    limiter.set_limits(requests_per_minute, tokens_per_minute)
+    return limiter
+
+
+class KeyPool:
+    """Пул API-ключей для параллельной генерации.
+
+    Ключи выдаются по кругу. Ключ, упершийся в лимит запросов или
+    квоту, уходит на паузу; ключ с ошибкой авторизации исключается до
+    конца запуска. У каждого ключа свой клиент и RateLimiter, общий
+    с другими заданиями того же провайдера (shared_limiter): лимиты
+    провайдера считаются на ключ, а не на задание.
+    """
+
+    def __init__(self, keys, client_factory, requests_per_minute=None, tokens_per_minute=None,
+                 max_wait=KEY_MAX_WAIT_SECONDS, provider=None):
+        self.keys = list(dict.fromkeys(key for key in keys if key))
+        self.client_factory = client_factory
+        self.limiters = {
+            key: shared_limiter(provider, key, requests_per_minute, tokens_per_minute) for key in self.keys
+        }
+        self.max_wait = max_wait
+        self.clients = {}
+        self.disabled = set()
+        self._next = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def client(self, key):
+        if key not in self.clients:
+            self.clients[key] = self.client_factory(key)
+        return self.clients[key]
+
+    @staticmethod
+    def cooldown_left(key):
+        with _cooldowns_lock:
+            return max(0.0, _cooldowns.get(key, 0.0) - time.monotonic())
+
+    def cool_down(self, key, seconds=None):
+        """Пауза ключа после лимита или исчерпанной квоты"""
+        until = time.monotonic() + (seconds if seconds is not None else KEY_COOLDOWN_SECONDS)
+        with _cooldowns_lock:
+            _cooldowns[key] = max(until, _cooldowns.get(key, 0.0))
+
+    def disable(self, key):
+        """Исключает неверный ключ до конца запуска"""
+        self.disabled.add(key)
+
+    async def acquire(self):
+        """Следующий рабочий ключ по кругу.
+
+        Если все ключи на паузе, ждет ближайшего; None - рабочих ключей
+        нет или ждать дольше max_wait секунд.
+        """
+        while True:
+            active = [key for key in self.keys if key not in self.disabled]
+            if not active:
+                return None
+            for _ in range(len(self.keys)):
+                key = self.keys[self._next % len(self.keys)]
+                self._next += 1
+                if key not in self.disabled and self.cooldown_left(key) <= 0:
+                    return key
+            wait = min(self.cooldown_left(key) for key in active)
+            if wait > self.max_wait:
+                return None
+            await asyncio.sleep(wait)
+
+    async def aclose(self):
+        for client in self.clients.values():
+            await client.close()
+        self.clients = {}
@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules.columns import REQUIRED_COLUMNS, canonical_column, normalize_columns
+from modules.engine import PlannerError, read_input
+from modules.input_cache import read_excel_sheets_cached
+from modules.posted_index import normalize_urls
+from modules.timing import StageTimer
+
+# Разделитель нескольких выгрузок в поле входного файла
+INPUT_SEPARATOR = ';'
+
+def split_inputs(text):
+    """Список путей из поля ввода: выгрузки разделяются точкой с запятой"""
+    return [path.strip() for path in text.split(INPUT_SEPARATOR) if path.strip()]
+
+
+def dedupe_exports(df):
+    """Убирает повторы изображений, оставляя запись с наибольшим saves.
+
+    Ссылки сравниваются в нормализованном виде (как в индексе истории),
+    поэтому размерные варианты одной картинки pinimg считаются одной.
+    Порядок оставшихся строк сохраняется.
+    """
+    df = df[df['image url'].notna()].reset_index(drop=True)
+    keys = normalize_urls(df['image url'])
+    saves = pd.to_numeric(df['saves'], errors='coerce').to_numpy(dtype=float, na_value=-np.inf)
+    order = np.argsort(-saves, kind='stable')
+    keep = order[~keys.take(order).duplicated().to_numpy()]
+    return df.take(np.sort(keep)).reset_index(drop=True)
+
+
+def read_export(path):
+    """Читает одну выгрузку (все листы Excel) и приводит столбцы к стандартным.
+
+    Выполняется в отдельном процессе; повторы внутри файла убираются
+    сразу, чтобы передавать обратно меньше данных.
+    """
+    if path.endswith('.csv'):
+        frames = [read_input(path)]
+    else:
+        # Все листы книги - через тот же кэш Parquet, что и read_input
+        frames = read_excel_sheets_cached(path, canonical_column)
+
+    frames = [frame for frame in map(normalize_columns, frames) if frame is not None]
+    if not frames:
+        raise PlannerError(
+            "Ошибка",
+            f"В файле {os.path.basename(path)} нет листа со столбцами: {', '.join(REQUIRED_COLUMNS)}",
+            "Ошибка: отсутствуют столбцы"
+        )
+    return dedupe_exports(pd.concat(frames, ignore_index=True))
+
+
+def merge_exports(paths, max_workers=None, status_callback=None):
+    """Объединяет несколько выгрузок Pinterest в одну таблицу.
+
+    Файлы читаются параллельно в пуле процессов, столбцы приводятся
+    к image url/saves/created date, повторы изображений убираются
+    с сохранением записи с наибольшим saves. Результат передается
+    планировщику напрямую, без промежуточной книги Excel.
+    """
+    if status_callback:
+        status_callback(f"Объединение выгрузок: {len(paths)}...")
+    if len(paths) == 1:
+        return read_export(paths[0])
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frames = list(executor.map(read_export, paths))
+    return dedupe_exports(pd.concat(frames, ignore_index=True))
+
+
+def load_sources(source, status_callback=None, timer=None):
+    """Источник для планировщика: путь, таблица или несколько выгрузок.
+
+    Строка с несколькими путями через точку с запятой или список путей
+    объединяются merge_exports; один путь и DataFrame возвращаются как есть.
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    paths = split_inputs(source) if isinstance(source, str) else list(source)
+    if len(paths) == 1:
+        return paths[0]
+    timer = timer or StageTimer()
+    with timer.stage('merge'):
+        df = merge_exports(paths, status_callback=status_callback)
+    timer.set_rows('merge', len(df))
+    return df
@@ -1,212 +1,159 @@
-import random
+import os
+import threading
 import tkinter.messagebox as messagebox
-from datetime import datetime, timedelta, time as dt_time
 
-import pandas as pd
-import numpy as np
-
-from modules.ai_generator import generate_unique_texts
-from modules.utils import convert_to_number, parse_date, check_for_duplicates
+from config import POSTED_INDEX_FILE, TIMING_LOG_FILE
+from modules.ai_generator import generate_unique_texts, ai_settings
+from modules.checkpoint import TextCheckpoint, job_key
+from modules.engine import (
+    PlannerConfig, PlannerError, build_schedule, format_schedule, write_schedule, record_posted, scheduled_texts
+)
+from modules.jobs import DONE, FAILED, rank_job
+from modules.timing import StageTimer, append_timing_record
+from modules.utils import convert_to_number
 
 
 class PinterestPlanner:
     def __init__(self, app):
         self.app = app
-
-    def run_planner(self):
-        """Запускает процесс генерации расписания публикаций"""
+        # История публикаций обновляется заданиями по очереди
+        self.posted_lock = threading.Lock()
+
+    def build_config(self):
+        """Собирает параметры планировщика из переменных интерфейса"""
+        post_limit = None
+        if self.app.enable_post_limit.get():
+            post_limit = convert_to_number(self.app.post_limit_var.get())
+
+        min_saves = None
+        if self.app.enable_min_saves.get():
+            min_saves = convert_to_number(self.app.min_saves_var.get())
+
+        windows = self.app.posting_windows_var.get().strip()
+        blackout = [d for d in self.app.blackout_dates_var.get().split(',') if d.strip()]
+
+        advanced = self.app.advanced_mode.get()
+        return PlannerConfig(
+            start_date=self.app.date_var.get(),
+            start_time=self.app.time_var.get(),
+            min_interval=int(self.app.min_interval_var.get()),
+            max_interval=int(self.app.max_interval_var.get()),
+            post_limit=post_limit,
+            min_saves=min_saves,
+            sort_by_saves_only=self.app.sort_by_saves_only.get(),
+            ranking=self.app.ranking_var.get(),
+            shuffle=self.app.shuffle_var.get(),
+            base_text=self.app.base_text_var.get(),
+            base_link=self.app.base_link_var.get(),
+            link_template=self.app.link_template_var.get() if advanced else None,
+            text_template=self.app.text_template_var.get() if advanced else None,
+            streaming=self.app.streaming_var.get(),
+            posting_windows={'*': windows} if windows else None,
+            blackout_dates=blackout or None,
+            daily_cap=convert_to_number(self.app.daily_cap_var.get()),
+            append=self.app.append_var.get(),
+            posted_index=POSTED_INDEX_FILE if self.app.skip_posted_var.get() else None
+        )
+
+    def build_ai_settings(self):
+        """Снимок настроек генерации текстов для задания (в потоке интерфейса)"""
+        return ai_settings(self.app)
+
+    def run_job(self, job, queue):
+        """Выполняет задание очереди: ранжирование в процессе пула, затем тексты и запись.
+
+        Работает в потоке задания: настройки берутся только из снимков
+        job.config и job.ai, прогресс и статус идут в строку задания через
+        queue.report, окна и общая строка состояния - через app.run_in_ui.
+        """
+        timer = StageTimer()
+        config = job.config
+        rows = 0
+        result = "error"
         try:
-            self.app.status_var.set("Чтение файла...")
-            file_path = self.app.input_file_var.get()
-
-            # Чтение входного файла
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
-
-            # Проверка обязательных столбцов
-            required_columns = ['image url', 'saves', 'created date']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-
-            if missing_columns:
-                self.app.status_var.set("Ошибка: отсутствуют столбцы")
-                messagebox.showerror(
-                    "Ошибка",
-                    f"В файле отсутствуют обязательные столбцы:\n\n{', '.join(missing_columns)}\n\n"
-                    f"Доступные столбцы: {', '.join(df.columns)}"
-                )
-                self.app.hide_progress()
-                return
-
-            self.app.status_var.set("Обработка дат...")
-            current_time = datetime.now()
-            date_errors = []
-
-            # Преобразование дат в правильный формат
-            date_series = df['created date'].copy()
-            converted_dates = pd.Series(index=date_series.index, dtype='datetime64[ns]')
-
-            try:
-                converted_dates = pd.to_datetime(date_series, errors='coerce', utc=False)
-            except Exception as e:
-                self.app.status_var.set(f"Ошибка преобразования: {str(e)}")
-                date_errors.append(f"Автоматическое преобразование не удалось: {str(e)}")
-
-            mask = converted_dates.isnull()
-            if mask.sum() > 0:
-                date_formats = [
-                    '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y',
-                    '%Y.%m.%d', '%Y/%m/%d', '%Y-%m-%d',
-                    '%d.%m.%y', '%d/%m/%y', '%d-%m-%y',
-                    '%d %b %Y', '%d %B %Y'
-                ]
-                for fmt in date_formats:
-                    if mask.sum() == 0:
-                        break
-                    try:
-                        # Создаем временную серию для преобразования
-                        temp_series = pd.Series(date_series[mask])
-                        partial = pd.to_datetime(temp_series, format=fmt, errors='coerce', utc=False)
-
-                        # Обновляем только успешно преобразованные значения
-                        success_mask = ~partial.isnull()
-                        converted_dates.loc[mask] = partial
-
-                        # Обновляем маску для оставшихся значений
-                        mask = converted_dates.isnull()
-                    except:
-                        continue
-
-            df['created date'] = converted_dates
-
-            # Проверка на некорректные даты
-            invalid_mask = df['created date'].isnull()
-            if invalid_mask.any():
-                invalid_count = invalid_mask.sum()
-                invalid_samples = date_series[invalid_mask].head(5).tolist()
-
-                error_details = (
-                    f"Найдены {invalid_count} некорректных дат в столбце created date.\n"
-                    f"Примеры некорректных значений:\n{invalid_samples}\n\n"
-                    "Убедитесь, что все даты в одном из форматов:\n"
-                    "ДД.ММ.ГГГГ, ДД/ММ/ГГГГ, ДД-ММ-ГГГГ, ГГГГ.ММ.ДД"
-                )
-
-                self.app.status_var.set("Ошибка: неверный формат даты")
-                messagebox.showerror("Ошибка формата даты", error_details)
-                self.app.hide_progress()
-                return
-
-            # Удаление часового пояса (если присутствует)
-            try:
-                # Проверяем, есть ли хотя бы одно значение с часовым поясом
-                if any(ts.tz is not None for ts in df['created date'] if pd.notnull(ts)):
-                    df['created date'] = df['created date'].dt.tz_convert(None)
-            except (TypeError, AttributeError):
-                # Игнорируем ошибки если столбец не содержит datetime или tz
-                pass
-
-            # Расчет весов для сортировки
-            if not self.app.sort_by_saves_only.get():
-                # Используем .dt.days вместо .dt.total_seconds()
-                df['days_passed'] = (current_time - df['created date']).dt.days
-                df['weight'] = df['saves'] / (df['days_passed'] + 1)
-                df = df.sort_values(by='weight', ascending=False)
-            else:
-                df = df.sort_values(by='saves', ascending=False)
-
-            # Применение фильтров
-            if self.app.enable_min_saves.get():
-                min_saves = convert_to_number(self.app.min_saves_var.get())
-                if min_saves is not None and 'saves' in df.columns:
-                    df = df[df['saves'] >= min_saves]
-
-            if self.app.enable_post_limit.get():
-                post_limit = convert_to_number(self.app.post_limit_var.get())
-                if post_limit is not None:
-                    df = df.head(post_limit)
-
-            # Проверка на пустой результат
-            if df.empty:
-                messagebox.showwarning("Предупреждение", "Нет данных для генерации расписания.")
-                self.app.status_var.set("Нет данных")
-                self.app.hide_progress()
-                return
-
-            self.app.status_var.set("Генерация текстов...")
-            count = len(df)
-
-            # Callback для обновления прогресса
+            # Прогресс и статус идут в строку задания, а не в общую строку состояния
             def update_progress(current, total):
-                progress = (current / total) * 100
-                self.app.root.after(0, self.app.update_progress_bar, progress, current, total)
-
-            # Генерация текстов и ссылок
-            base_text = self.app.base_text_var.get()
-            base_link = self.app.base_link_var.get()
-
-            texts = generate_unique_texts(self.app, base_text, count, update_progress)
-            links = self.generate_unique_links(base_link, count)
-
-            df['text'] = texts
-            df['link'] = links
-
-            # Проверка на дубликаты
-            duplicates_found = check_for_duplicates(df)
-
-            # Подготовка дат публикаций
-            start_date = parse_date(self.app.date_var.get())
-            start_time = self.app.time_var.get()
-            min_interval = int(self.app.min_interval_var.get())
-            max_interval = int(self.app.max_interval_var.get())
-
-            try:
-                start_hour, start_minute = map(int, start_time.split(':'))
-                start_datetime = datetime.combine(start_date, dt_time(start_hour, start_minute))
-            except Exception:
-                start_datetime = datetime.combine(start_date, dt_time(12, 0))
-
-            # Создание выходного DataFrame
-            df_output = pd.DataFrame({
-                'text': df['text'],
-                'link': df['link'],
-                'image1': df['image url']
-            })
-
-            # Перемешивание, если нужно
-            if self.app.shuffle_var.get():
-                df_output = df_output.sample(frac=1).reset_index(drop=True)
-
-            # Генерация дат публикаций
-            datetimes = []
-            current = start_datetime
-
-            for i in range(len(df_output)):
-                datetimes.append(current)
-                interval = random.randint(min_interval, max_interval)
-                current += timedelta(minutes=interval)
+                queue.report(job, f"Генерация текстов: {current}/{total}", current / total * 100)
+
+            def update_status(message):
+                queue.report(job, message)
+
+            def report_ai_status(message):
+                # Сообщения генерации (ключи, кэш, ошибки) остаются в строке задания
+                queue.report(job, message, job.progress)
+
+            update_status("Чтение и ранжирование...")
+            df, config, start, stages = queue.run_in_process(rank_job, job.input_path, config, job.output_path)
+            timer.merge(stages)
+
+            # Контрольные точки AI: ключ - хэш входного файла и настроек
+            ai = job.ai.cache_settings()
+            key = job_key(job.input_path, {**job.config.to_dict(), **ai}) if ai else None
+            checkpoints = []
+            # Тексты расписания и этого запуска не берутся из кэша AI повторно
+            used_texts = scheduled_texts(config, job.output_path) if ai else set()
+
+            def generate_texts(base_text, count, progress_callback, number_start):
+                checkpoint = None
+                if key:
+                    checkpoint = TextCheckpoint.for_job(key, count, number_start)
+                    checkpoints.append(checkpoint)
+                texts = generate_unique_texts(
+                    self.app, job.ai, base_text, count, progress_callback, number_start, checkpoint,
+                    report_ai_status, used_texts
+                )
+                used_texts.update(texts)
+                return texts
 
-            df_output['date'] = [dt.strftime('%d.%m.%Y %H:%M') for dt in datetimes]
+            df_output = build_schedule(df, config, generate_texts, update_progress, update_status, start, timer)
+            with timer.stage('format', rows=len(df_output)):
+                df_output = format_schedule(df_output)
 
             # Сохранение результата
-            output_path = self.app.output_file_var.get()
-            df_output[['date', 'text', 'link', 'image1']].to_csv(output_path, index=False)
-
-            self.app.status_var.set(f"Готово! Сгенерировано {len(df)} записей")
-            self.app.hide_progress()
-            messagebox.showinfo("Успешно", f"Файл сохранен: {output_path}")
+            rows = len(df_output)
+            with timer.stage('write', rows=rows):
+                write_schedule(df_output, job.output_path, append=config.append)
+            with timer.stage('posted'), self.posted_lock:
+                record_posted(df_output, config)
+            for checkpoint in checkpoints:
+                checkpoint.clear()
+            result = "ok"
+
+            status = f"Готово: {rows} записей за {timer.total:.1f} с"
+            if timer.peak_mb is not None:
+                status += f", пик памяти {timer.peak_mb:.0f} МБ"
+            stages = timer.summary(separator="\n")
+            details = f"Файл сохранен: {job.output_path}\n\nВремя этапов:\n{stages}"
+            queue.report(job, status, 100.0, state=DONE, details=details)
+            self.app.run_in_ui(self.app.status_var.set, f"Задание {job.job_id}: {status}")
+
+        except PlannerError as e:
+            result = e.status
+            queue.report(job, e.status, state=FAILED, details=e.message)
+            dialog = messagebox.showwarning if e.level == "warning" else messagebox.showerror
+            self.app.run_in_ui(dialog, e.title, f"{job.input_name}: {e.message}")
 
         except Exception as e:
-            self.app.status_var.set("Ошибка!")
-            self.app.hide_progress()
-            self.app.log_error(e)
-            self.app.show_error_with_details(e)
-
-    def generate_unique_links(self, base_link, count):
-        """Генерирует уникальные ссылки для постов"""
-        base_link = base_link.rstrip('/')
-        if self.app.advanced_mode.get() and self.app.link_template_var.get():
-            template = self.app.link_template_var.get()
-            return [f"{base_link}{template.replace('{num}', str(101 + i))}" for i in range(count)]
-        return [f"{base_link}/?{101 + i}" for i in range(count)]
\ No newline at end of file
+            queue.report(job, "Ошибка!", state=FAILED, details=str(e))
+            self.app.run_in_ui(self.app.log_error, e)
+            self.app.run_in_ui(self.app.show_error_with_details, e)
+
+        finally:
+            self.save_timings(timer, job.input_name, job.config, rows, result, job.ai.uses_ai)
+
+    def save_timings(self, timer, input_path, config, rows, result, ai=False):
+        """Дописывает замеры запуска в журнал для отслеживания регрессий"""
+        record = timer.to_record(
+            result=result,
+            input=os.path.basename(input_path),
+            rows=rows,
+            streaming=config.streaming,
+            ranking=config.ranking,
+            append=config.append,
+            ai=ai
+        )
+        try:
+            append_timing_record(TIMING_LOG_FILE, record)
+        except OSError:
+            # Журнал замеров не должен мешать основной работе
+            pass
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Размерные варианты одной картинки Pinterest: /236x/, /564x/, /736x/, /originals/
+PINIMG_SIZE_PATTERN = r'^(i\.pinimg\.com)/(?:\d+x\d*|originals)/'
+
+
+def normalize_urls(urls):
+    """Приводит ссылки на изображения к каноническому виду.
+
+    Убирает схему, www, параметры и якорь, приводит к нижнему регистру
+    и сводит размерные варианты pinimg к одному ключу.
+    """
+    # Строки Arrow приводятся к str без промежуточных объектов Python
+    s = pd.Series(urls).astype(str).str.strip().str.lower()
+    s = s.str.replace(r'^[a-z]+://', '', regex=True)
+    s = s.str.replace(r'^www\.', '', regex=True)
+    s = s.str.replace(r'[?#].*$', '', regex=True)
+    s = s.str.replace(PINIMG_SIZE_PATTERN, r'\1/', regex=True)
+    return s.str.rstrip('/')
+
+
+def hash_urls(urls):
+    """64-битные хэши нормализованных ссылок"""
+    normalized = normalize_urls(urls)
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+
+
+class ImageSet:
+    """Множество изображений в памяти (отсортированный массив хэшей)"""
+
+    def __init__(self, hashes=None):
+        self.hashes = np.unique(hashes) if hashes is not None else np.array([], dtype=np.uint64)
+
+    @classmethod
+    def from_urls(cls, urls):
+        return cls(hash_urls(urls))
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contains(self, urls):
+        """Векторная проверка принадлежности: один searchsorted на весь столбец"""
+        if not len(self.hashes) or not len(urls):
+            return np.zeros(len(urls), dtype=bool)
+        queries = hash_urls(urls)
+        positions = np.searchsorted(self.hashes, queries)
+        positions[positions == len(self.hashes)] = 0
+        return self.hashes[positions] == queries
+
+
+class PostedIndex(ImageSet):
+    """Хранимый на диске индекс уже запланированных изображений.
+
+    Файл - отсортированный массив uint64 в формате .npy (8 байт на
+    ссылку), открывается через memmap, поэтому проверка не требует
+    загрузки всего индекса в память.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            self.hashes = np.load(path, mmap_mode='r')
+        else:
+            self.hashes = np.array([], dtype=np.uint64)
+
+    def add(self, urls):
+        """Добавляет ссылки и атомарно перезаписывает файл индекса"""
+        merged = np.union1d(self.hashes, hash_urls(urls)).astype(np.uint64)
+        # Освобождаем memmap до замены файла (иначе Windows не даст его заменить)
+        self.hashes = merged
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, merged)
+        os.replace(tmp_path, self.path)
+        return len(merged)
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Зарегистрированные формулы ранжирования: имя -> функция(saves, age_days, params)
+SCORERS = {}
+
+DEFAULT_SCORER = 'weight'
+
+
+def scorer(name):
+    """Регистрирует формулу ранжирования под именем"""
+    def register(func):
+        SCORERS[name] = func
+        return func
+    return register
+
+
+@scorer('weight')
+def weight_score(saves, age_days, params):
+    """Сохранения на день жизни пина: saves / (дни + 1)"""
+    return saves / (np.floor(age_days) + 1)
+
+
+@scorer('saves')
+def saves_score(saves, age_days, params):
+    """Только количество сохранений"""
+    return saves.astype(np.float64)
+
+
+@scorer('half_life')
+def half_life_score(saves, age_days, params):
+    """Экспоненциальное затухание: вес сохранений падает вдвое за half_life_days"""
+    half_life = float(params.get('half_life_days', 30))
+    return saves * np.exp2(-np.maximum(age_days, 0) / half_life)
+
+
+@scorer('log_saves')
+def log_saves_score(saves, age_days, params):
+    """Логарифм сохранений - сглаживает вирусные пины"""
+    return np.log1p(np.maximum(saves, 0))
+
+
+@scorer('recency')
+def recency_score(saves, age_days, params):
+    """Логарифм сохранений плюс бонус свежим пинам"""
+    boost = float(params.get('boost', 2.0))
+    window = float(params.get('recency_days', 14))
+    return np.log1p(np.maximum(saves, 0)) + boost * np.exp(-np.maximum(age_days, 0) / window)
+
+
+def compute_scores(saves, created, current_time, name=DEFAULT_SCORER, params=None):
+    """Считает оценки векторно по массивам сохранений и дат создания"""
+    if name not in SCORERS:
+        raise ValueError(f"Неизвестная формула ранжирования: {name}. Доступны: {', '.join(SCORERS)}")
+    saves = np.asarray(saves, dtype=np.float64)
+    created = np.asarray(created, dtype='datetime64[ns]')
+    age_days = (np.datetime64(current_time, 'ns') - created) / np.timedelta64(1, 'D')
+    return SCORERS[name](saves, age_days, params or {})
+
+
+def select_top(scores, limit=None):
+    """Позиции строк по убыванию оценки.
+
+    С лимитом лучшие limit строк выбираются через argpartition, и
+    сортируются только они. При равных оценках сохраняется исходный
+    порядок строк.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    # NaN уходят в конец
+    keys = np.where(np.isnan(scores), -np.inf, scores)
+    if limit is not None and limit < len(keys):
+        if limit <= 0:
+            return np.array([], dtype=np.int64)
+        candidates = np.argpartition(-keys, limit - 1)[:limit]
+        # Порог мог разрезать группу равных оценок - берем первые по позиции
+        threshold = keys[candidates].min()
+        candidates = np.concatenate([np.flatnonzero(keys > threshold), np.flatnonzero(keys == threshold)])[:limit]
+    else:
+        candidates = np.arange(len(keys))
+    return candidates[np.lexsort((candidates, -keys[candidates]))]
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Ведро токенов с непрерывным пополнением.
+
+    per_minute - емкость ведра и скорость пополнения в минуту; None или
+    0 - без ограничения. Запрос больше емкости ждет полного ведра, чтобы
+    не зависнуть навсегда.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.clock = clock
+        self.capacity = self.rate = self.available = 0.0
+        self.updated = clock()
+        self.set_rate(per_minute)
+
+    def set_rate(self, per_minute):
+        """Меняет лимит, не сбрасывая уже взятое из ведра"""
+        capacity = float(per_minute or 0)
+        if capacity == self.capacity:
+            return
+        self._refill()
+        spent = self.capacity - self.available
+        self.capacity = capacity
+        self.rate = capacity / 60.0
+        self.available = capacity - spent if capacity > 0 else 0.0
+
+    @property
+    def unlimited(self):
+        return self.capacity <= 0
+
+    def _refill(self):
+        now = self.clock()
+        if self.unlimited:
+            self.updated = now
+            return
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Сколько секунд ждать, пока в ведре наберется amount"""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.available) / self.rate)
+
+    def consume(self, amount):
+        if not self.unlimited:
+            self._refill()
+            self.available -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Ограничение запросов в минуту (RPM) и токенов в минуту (TPM).
+
+    acquire(tokens) сразу резервирует место в обоих ведрах (ведро может
+    уйти в минус) и ждет своей очереди, поэтому запросы обслуживаются
+    в порядке обращения. Резерв берется под обычным замком потока:
+    один лимитер можно делить между заданиями, у каждого из которых
+    свой цикл событий в своем потоке.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+
+    def set_limits(self, requests_per_minute=None, tokens_per_minute=None):
+        with self._lock:
+            self.requests.set_rate(requests_per_minute)
+            self.tokens.set_rate(tokens_per_minute)
+
+    async def acquire(self, tokens=0):
+        with self._lock:
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
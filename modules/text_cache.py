@@ -0,0 +1,95 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+from config import AI_CACHE_FILE, AI_CACHE_MAX_TEXTS, AI_CACHE_TTL_DAYS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    UNIQUE (key, text)
+);
+CREATE INDEX IF NOT EXISTS texts_key ON texts (key, used, id);
+CREATE INDEX IF NOT EXISTS texts_used ON texts (used, id);
+"""
+
+
+def cache_key(settings, prompt_template, topic):
+    """Ключ кэша: провайдер, модель, температура, шаблон запроса и тема"""
+    data = {
+        'provider': settings.get('provider'),
+        'model': settings.get('model'),
+        # Температура берется со шкалы - округляем, иначе совпадений почти не будет
+        'temperature': round(float(settings.get('temperature') or 0), 2),
+        'prompt': prompt_template,
+        'topic': topic.strip().lower(),
+    }
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class TextCache:
+    """Кэш разобранных ответов AI в SQLite.
+
+    Тексты хранятся по ключу cache_key. Тексты старше ttl_days не
+    выдаются и удаляются; если текстов больше max_texts, удаляются давно
+    не использованные. Каждая операция открывает свое соединение, поэтому
+    кэшем можно пользоваться из нескольких заданий одновременно.
+    """
+
+    def __init__(self, path=AI_CACHE_FILE, max_texts=AI_CACHE_MAX_TEXTS, ttl_days=AI_CACHE_TTL_DAYS):
+        self.path = path
+        self.max_texts = max_texts
+        self.ttl_seconds = ttl_days * 86400
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.executescript(SCHEMA)
+        return conn
+
+    def get(self, key, count, exclude=()):
+        """До count свежих текстов по ключу, давно не выданные - первыми.
+
+        exclude - тексты, которые выдавать нельзя: уже стоящие в
+        расписании и выданные в этом запуске. Без него замена дубликатов
+        или дописывание получили бы из кэша те же тексты, что только что
+        ушли в расписание (после put они и есть давно не выданные).
+        """
+        now = time.time()
+        exclude = set(exclude)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM texts WHERE created < ?", (now - self.ttl_seconds,))
+            rows = []
+            cursor = conn.execute("SELECT id, text FROM texts WHERE key = ? ORDER BY used, id", (key,))
+            for row in cursor:
+                if len(rows) >= count:
+                    break
+                if row[1] not in exclude:
+                    rows.append(row)
+            cursor.close()
+            conn.executemany("UPDATE texts SET used = ? WHERE id = ?", [(now, row[0]) for row in rows])
+        return [row[1] for row in rows]
+
+    def put(self, key, texts):
+        """Добавляет новые тексты и вытесняет лишние"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO texts (key, text, created, used) VALUES (?, ?, ?, ?)",
+                [(key, text, now, now) for text in texts if text]
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM texts").fetchone()[0] - self.max_texts
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM texts WHERE id IN (SELECT id FROM texts ORDER BY used, id LIMIT ?)", (excess,)
+                )
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM texts")
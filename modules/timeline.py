@@ -0,0 +1,203 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = '%d.%m.%Y'
+TIME_FORMAT = '%H:%M'
+
+
+def make_rng(seed=None):
+    """Генератор случайных чисел; одинаковый seed дает одинаковый план"""
+    return np.random.default_rng(seed)
+
+
+def build_timeline(start_datetime, count, min_interval, max_interval, rng=None):
+    """Генерирует даты публикаций со случайными интервалами.
+
+    Все интервалы (в минутах, включая границы) выбираются одним вызовом
+    генератора, моменты публикаций получаются накопленной суммой.
+    Возвращает DatetimeIndex.
+    """
+    if rng is None:
+        rng = make_rng()
+    if count <= 0:
+        return pd.DatetimeIndex([])
+
+    intervals = rng.integers(min_interval, max_interval, size=count - 1, endpoint=True)
+    offsets = np.concatenate(([0], np.cumsum(intervals, dtype=np.int64)))
+    return pd.Timestamp(start_datetime) + pd.to_timedelta(offsets, unit='m')
+
+
+def format_timeline(timeline, date_format=DATE_FORMAT, time_format=TIME_FORMAT):
+    """Форматирует даты публикаций для CSV без построчного strftime.
+
+    Дни форматируются один раз на уникальный день, время - по таблице
+    из 1440 минут суток, затем части склеиваются векторно.
+    """
+    days = timeline.normalize()
+    day_codes, unique_days = pd.factorize(days)
+    day_labels = np.asarray(unique_days.strftime(date_format), dtype=object)
+
+    minute_of_day = (timeline.hour * 60 + timeline.minute).to_numpy()
+    minute_labels = np.asarray(
+        pd.date_range('2000-01-01', periods=24 * 60, freq='min').strftime(time_format), dtype=object
+    )
+
+    return day_labels[day_codes] + ' ' + minute_labels[minute_of_day]
+
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+MINUTES_PER_DAY = 24 * 60
+
+
+def _parse_clock(value):
+    hours, minutes = map(int, value.strip().split(':'))
+    total = hours * 60 + minutes
+    if not 0 <= total <= MINUTES_PER_DAY:
+        raise ValueError(f"Некорректное время: {value}")
+    return total
+
+
+def parse_window_list(text):
+    """Разбирает строку вида '09:00-12:00, 18:00-22:00' в список интервалов в минутах"""
+    windows = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, end = part.split('-')
+        start, end = _parse_clock(start), _parse_clock(end)
+        if end <= start:
+            raise ValueError(f"Окно должно заканчиваться позже начала: {part}")
+        windows.append((start, end))
+    return sorted(windows)
+
+
+def parse_posting_windows(spec):
+    """Приводит описание окон к списку из 7 дней (пн=0).
+
+    spec - словарь {'*': '09:00-21:00', 'sat': '11:00-14:00', ...};
+    ключи - сокращения дней недели или номера 0-6, '*' - все остальные
+    дни. Значение - строка окон или список строк. Пустая строка - день
+    без публикаций.
+    """
+    def to_windows(value):
+        if isinstance(value, str):
+            return parse_window_list(value)
+        return parse_window_list(','.join(value))
+
+    default = to_windows(spec['*']) if '*' in spec else []
+    days = [list(default) for _ in range(7)]
+    for key, value in spec.items():
+        if key == '*':
+            continue
+        name = str(key).strip().lower()
+        if name.isdigit():
+            day = int(name)
+        elif name[:3] in WEEKDAYS:
+            day = WEEKDAYS.index(name[:3])
+        else:
+            day = None
+        if day is None or not 0 <= day < 7:
+            raise ValueError(f"Неизвестный день недели: {key} (нужно mon-sun или 0-6)")
+        days[day] = to_windows(value)
+    return days
+
+
+def build_calendar_timeline(start_datetime, count, min_interval, max_interval,
+                            posting_windows=None, blackout_dates=(), daily_cap=None, rng=None, day_counts=None,
+                            reserved=None):
+    """Распределяет публикации по окнам дней недели с лимитом в день.
+
+    Интервалы выбираются одним вызовом генератора. Внутри окна моменты
+    публикаций получаются накопленной суммой, а число помещающихся
+    публикаций - через searchsorted, поэтому цикл идет по окнам, а не
+    по минутам или постам. Вне окон, в даты-исключения и после лимита
+    дня планировщик переходит сразу к началу следующего окна.
+    day_counts - {дата: число публикаций}, уже занявших лимит дня
+    (например, в дописываемом расписании).
+    reserved - занятые минуты (например, слоты других аккаунтов):
+    публикация, попавшая на занятую минуту, сдвигается на минуту позже,
+    а следующие идут от нее с теми же интервалами - окна, лимит дня и
+    минимальный интервал при этом соблюдаются.
+    Если окна не вмещают ни одной публикации, выбрасывается ValueError.
+    """
+    if rng is None:
+        rng = make_rng()
+    if count <= 0:
+        return pd.DatetimeIndex([])
+    if daily_cap is not None and daily_cap < 1:
+        raise ValueError(f"Лимит публикаций в день должен быть не меньше 1: {daily_cap}")
+
+    days = posting_windows or [[(0, MINUTES_PER_DAY)] for _ in range(7)]
+    if not any(days):
+        raise ValueError("Не задано ни одного окна публикаций")
+    blackout = set(blackout_dates)
+
+    intervals = rng.integers(min_interval, max_interval, size=count, endpoint=True)
+    base = pd.Timestamp(start_datetime).normalize()
+    base_date = base.date()
+    position = (pd.Timestamp(start_datetime) - base) // pd.Timedelta(minutes=1)
+    taken = None
+    if reserved is not None and len(reserved):
+        taken = np.sort(((pd.DatetimeIndex(reserved) - base) // pd.Timedelta(minutes=1)).to_numpy(dtype=np.int64))
+
+    # Дней подряд без публикаций не может быть больше, чем недель без окон,
+    # исключений, заполненных и занятых дней и самого длинного интервала
+    idle_limit = 7 + len(blackout) + len(day_counts or ()) + int(max_interval) // MINUTES_PER_DAY + 1
+    if taken is not None:
+        idle_limit += len(np.unique(taken // MINUTES_PER_DAY))
+    idle_days = 0
+
+    slots = np.empty(count, dtype=np.int64)
+    placed = 0
+    day = 0
+    while placed < count:
+        if idle_days > idle_limit:
+            raise ValueError("Окна публикаций не вмещают ни одной публикации")
+        placed_before = placed
+        date = base_date + timedelta(days=day)
+        windows = days[date.weekday()]
+        day_start = day * MINUTES_PER_DAY
+        day_placed = day_counts.get(date, 0) if day_counts else 0
+
+        if date not in blackout:
+            for window_start, window_end in windows:
+                if placed >= count or (daily_cap is not None and day_placed >= daily_cap):
+                    break
+                start = max(position, day_start + window_start)
+                end = day_start + window_end
+
+                while start < end and placed < count and (daily_cap is None or day_placed < daily_cap):
+                    limit = count - placed
+                    if daily_cap is not None:
+                        limit = min(limit, daily_cap - day_placed)
+                    if min_interval > 0:
+                        limit = min(limit, (end - start - 1) // min_interval + 1)
+
+                    offsets = np.concatenate(([0], np.cumsum(intervals[placed:placed + limit - 1])))
+                    fitted = int(np.searchsorted(offsets, end - start, side='left'))
+                    candidates = start + offsets[:fitted]
+                    clash = None
+                    if taken is not None and fitted:
+                        found = np.searchsorted(taken, candidates)
+                        hits = np.flatnonzero(taken[np.minimum(found, len(taken) - 1)] == candidates)
+                        if len(hits):
+                            fitted = int(hits[0])
+                            clash = int(candidates[fitted])
+
+                    slots[placed:placed + fitted] = candidates[:fitted]
+                    placed += fitted
+                    day_placed += fitted
+                    if fitted:
+                        position = slots[placed - 1] + intervals[placed - 1]
+                    if clash is None:
+                        break
+                    # Минута занята - публикация переходит на следующую
+                    start = position = clash + 1
+
+        idle_days = idle_days + 1 if placed == placed_before else 0
+        day += 1
+
+    return base + pd.to_timedelta(slots, unit='m')
@@ -0,0 +1,141 @@
+import ctypes
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import VERSION
+
+# Названия этапов для сводки
+STAGE_LABELS = {
+    'merge': "Объединение",
+    'read': "Чтение",
+    'dates': "Даты",
+    'ranking': "Ранжирование",
+    'texts': "Тексты",
+    'links': "Ссылки",
+    'dedupe': "Дубликаты",
+    'timeline': "Расписание",
+    'format': "Форматирование",
+    'write': "Запись",
+    'posted': "История",
+}
+
+
+def peak_memory_mb():
+    """Пиковое потребление памяти процессом (МБ) или None, если неизвестно"""
+    if sys.platform == 'win32':
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ('cb', ctypes.c_ulong), ('PageFaultCount', ctypes.c_ulong),
+                ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        try:
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return None
+        except (AttributeError, OSError):
+            return None
+        return counters.PeakWorkingSetSize / 2 ** 20
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS - байты
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class StageTimer:
+    """Замеры времени этапов планировщика.
+
+    Повторные замеры этапа с тем же именем суммируются (так потоковое
+    чтение учитывает каждую часть файла). rows - число строк на выходе
+    этапа, если оно известно. После каждого этапа запоминается пик
+    памяти процесса - по росту пика видно, какой этап его поднял.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            entry = self.stages.setdefault(name, {'seconds': 0.0, 'rows': None})
+            entry['seconds'] += time.perf_counter() - start
+            entry['peak_mb'] = peak_memory_mb()
+            if rows is not None:
+                self.set_rows(name, rows)
+
+    def set_rows(self, name, rows):
+        """Задает число строк этапа после его завершения"""
+        self.stages.setdefault(name, {'seconds': 0.0, 'rows': None})['rows'] = int(rows)
+
+    def merge(self, stages):
+        """Добавляет замеры, сделанные в другом процессе (словарь stages)"""
+        for name, other in stages.items():
+            entry = self.stages.setdefault(name, {'seconds': 0.0, 'rows': None})
+            entry['seconds'] += other['seconds']
+            if other.get('rows') is not None:
+                entry['rows'] = other['rows']
+            if other.get('peak_mb') is not None:
+                entry['peak_mb'] = max(other['peak_mb'], entry.get('peak_mb') or 0)
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def peak_mb(self):
+        peaks = [entry['peak_mb'] for entry in self.stages.values() if entry.get('peak_mb') is not None]
+        return max(peaks) if peaks else peak_memory_mb()
+
+    def summary(self, separator=", "):
+        """Краткая сводка: "Чтение 0.41 с (120000 строк), ..." """
+        parts = []
+        for name, entry in self.stages.items():
+            text = f"{STAGE_LABELS.get(name, name)} {entry['seconds']:.2f} с"
+            if entry['rows'] is not None:
+                text += f" ({entry['rows']} строк)"
+            parts.append(text)
+        if self.peak_mb is not None:
+            parts.append(f"Пик памяти {self.peak_mb:.0f} МБ")
+        return separator.join(parts)
+
+    def to_record(self, **extra):
+        """Машиночитаемая запись о запуске"""
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'version': VERSION,
+            'total_seconds': round(self.total, 4),
+            'peak_memory_mb': round(self.peak_mb, 1) if self.peak_mb is not None else None,
+            'stages': {
+                name: {
+                    'seconds': round(entry['seconds'], 4),
+                    'rows': entry['rows'],
+                    'peak_mb': round(entry['peak_mb'], 1) if entry.get('peak_mb') is not None else None
+                }
+                for name, entry in self.stages.items()
+            },
+            **extra
+        }
+
+
+def append_timing_record(path, record):
+    """Дописывает запись в журнал замеров (одна JSON-строка на запуск)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
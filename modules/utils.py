@@ -49,15 +49,6 @@ def convert_to_number(s):
         except ValueError:
             return None
 
-def parse_date(date_str):
-    try:
-        return datetime.strptime(date_str, "%d.%m.%Y").date()
-    except ValueError:
-        try:
-            return datetime.strptime(date_str, "%d%m%Y").date()
-        except ValueError:
-            return datetime.now().date()
-
 def format_date_input(event, date_var):
     current = date_var.get()
     cursor_pos = event.widget.index(tk.INSERT)
@@ -118,16 +109,6 @@ def update_openrouter_keys(combo, key_manager, key_var):
     combo['values'] = display_keys
     if keys: key_var.set(keys[0])
 
-def check_for_duplicates(df):
-    duplicates = False
-    if df['text'].duplicated().any():
-        dup_text = df[df['text'].duplicated(keep=False)]
-        duplicates = True
-    if df['link'].duplicated().any():
-        dup_links = df[df['link'].duplicated(keep=False)]
-        duplicates = True
-    return duplicates
-
 def log_error(exception, app):
     error_info = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -136,7 +117,7 @@ def log_error(exception, app):
         "output_file": app.output_file_var.get(),
         "error_type": type(exception).__name__,
         "error_message": str(exception),
-        "traceback": traceback.format_exc(),
+        "traceback": "".join(traceback.format_exception(exception)),
         "auth_user": app.auth.current_user or "none"
     }
     try:
@@ -0,0 +1,241 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+from modules.input_cache import file_hash
+
+DEFAULT_PATTERNS = ['*.xlsx', '*.xls', '*.csv']
+# Временные файлы Excel и загрузчиков, скрытые файлы и собственные результаты
+IGNORED_PATTERNS = ['~$*', '.*', '*.tmp', '*.part', '*.crdownload', '*_schedule.*']
+PROCESSED_FILE = '.pinplan_processed.json'
+
+DEFAULT_SETTLE_SECONDS = 10.0
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+def is_candidate(name, patterns=DEFAULT_PATTERNS):
+    """Подходит ли имя файла под шаблоны выгрузок"""
+    lower = name.lower()
+    if any(fnmatch.fnmatch(lower, pattern) for pattern in IGNORED_PATTERNS):
+        return False
+    return any(fnmatch.fnmatch(lower, pattern.lower()) for pattern in patterns)
+
+
+class InotifyWatch:
+    """События каталога через inotify (Linux), без сторонних пакетов"""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch")
+
+    def wait(self, timeout):
+        """Имена измененных файлов за время ожидания (пустое множество - изменений нет)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatch:
+    """Опрос каталога: wait возвращает None - проверить нужно все файлы"""
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        return None
+
+    def close(self):
+        pass
+
+
+def open_watch(directory, polling=False):
+    """inotify, где он есть, иначе опрос"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatch(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatch()
+
+
+class ProcessedRegistry:
+    """Учет обработанных файлов: размер, mtime и хэш содержимого.
+
+    Файл с тем же размером и mtime считается обработанным; при другом
+    mtime сверяется хэш, чтобы не обрабатывать повторно файл, который
+    только перезаписали без изменений.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def is_processed(self, name, path, state):
+        entry = self.entries.get(name)
+        if entry is None:
+            return False
+        if (entry['size'], entry['mtime_ns']) == state:
+            return True
+        if entry['size'] == state[0] and entry.get('hash') == file_hash(path):
+            entry['mtime_ns'] = state[1]
+            self.save()
+            return True
+        return False
+
+    def mark(self, name, path, state, status, output=None, message=None):
+        self.entries[name] = {
+            'size': state[0],
+            'mtime_ns': state[1],
+            'hash': file_hash(path),
+            'status': status,
+            'output': output,
+            'message': message,
+            'processed_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self.save()
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _can_open(path):
+    """Файл, который еще держит открытым писатель, в Windows не открывается"""
+    try:
+        with open(path, 'rb'):
+            return True
+    except OSError:
+        return False
+
+
+class FolderWatcher:
+    """Следит за каталогом и передает обработчику дописанные выгрузки.
+
+    Файл считается дописанным, когда его размер и mtime не меняются
+    settle_seconds секунд и его можно открыть. handler(path) возвращает
+    путь результата; исключение обработчика записывается в учет, и
+    файл не обрабатывается снова, пока не изменится.
+    """
+
+    def __init__(self, directory, handler, patterns=None, settle_seconds=DEFAULT_SETTLE_SECONDS,
+                 poll_interval=DEFAULT_POLL_INTERVAL, polling=False, log=print):
+        self.directory = directory
+        self.handler = handler
+        self.patterns = patterns or DEFAULT_PATTERNS
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.polling = polling
+        self.log = log
+        self.registry = ProcessedRegistry(os.path.join(directory, PROCESSED_FILE))
+        # Имя -> (размер, mtime_ns, с какого момента не меняется)
+        self.pending = {}
+
+    def scan(self, names=None):
+        """Обновляет список ожидающих файлов; names=None - весь каталог"""
+        if names is None:
+            with os.scandir(self.directory) as entries:
+                names = [entry.name for entry in entries if entry.is_file()]
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if not is_candidate(name, self.patterns) or not os.path.isfile(path):
+                self.pending.pop(name, None)
+                continue
+            state = _file_state(path)
+            previous = self.pending.get(name)
+            if previous is not None and previous[:2] == state:
+                continue
+            if self.registry.is_processed(name, path, state):
+                self.pending.pop(name, None)
+                continue
+            # Впервые увиденный файл отсчитывает тишину от mtime, измененный - от текущего момента
+            since = min(now, state[1] / 1e9) if previous is None else now
+            self.pending[name] = (*state, since)
+
+    def ready(self):
+        """Файлы, которые не менялись settle_seconds и уже не заняты писателем"""
+        now = time.time()
+        return [
+            name for name, (_, _, since) in sorted(self.pending.items())
+            if now - since >= self.settle_seconds and _can_open(os.path.join(self.directory, name))
+        ]
+
+    def process(self, name):
+        path = os.path.join(self.directory, name)
+        size, mtime_ns, _ = self.pending.pop(name)
+        state = (size, mtime_ns)
+        try:
+            output = self.handler(path)
+        except Exception as e:
+            self.log(f"{name}: ошибка {type(e).__name__}: {getattr(e, 'message', e)}")
+            self.registry.mark(name, path, state, 'error', message=str(e))
+            return
+        self.registry.mark(name, path, state, 'ok', output=output)
+
+    def run_once(self):
+        """Одна проверка каталога: обрабатывает все готовые файлы"""
+        self.scan()
+        for name in self.ready():
+            self.process(name)
+
+    def run(self, should_stop=lambda: False):
+        """Основной цикл демона"""
+        watch = open_watch(self.directory, self.polling)
+        mode = "опрос" if isinstance(watch, PollingWatch) else "inotify"
+        self.log(f"Наблюдение за {os.path.abspath(self.directory)} ({mode}), Ctrl+C - остановка")
+        try:
+            # Файлы, появившиеся пока демон не работал
+            self.scan()
+            while not should_stop():
+                timeout = min(self.poll_interval, self.settle_seconds / 2) if self.pending else self.poll_interval
+                changed = watch.wait(timeout)
+                self.scan(changed)
+                # Ожидающие файлы перепроверяются, даже если событий не было
+                self.scan(list(self.pending))
+                for name in self.ready():
+                    self.process(name)
+        finally:
+            watch.close()
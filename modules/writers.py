@@ -0,0 +1,134 @@
+import gzip
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+WRITE_CHUNK_ROWS = 100_000
+
+# Расширение файла -> формат
+FORMAT_EXTENSIONS = {
+    '.csv.gz': 'csv.gz',
+    '.gz': 'csv.gz',
+    '.parquet': 'parquet',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.csv': 'csv',
+}
+
+
+def detect_format(path):
+    """Определяет формат по расширению; по умолчанию CSV для загрузчика Pinterest"""
+    lower = path.lower()
+    for extension, fmt in FORMAT_EXTENSIONS.items():
+        if lower.endswith(extension):
+            return fmt
+    return 'csv'
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _write_csv(df, f, header, chunk_rows):
+    for i, chunk in enumerate(_chunks(df, chunk_rows)):
+        chunk.to_csv(f, index=False, header=header and i == 0)
+    if header and df.empty:
+        df.to_csv(f, index=False)
+
+
+def _write_jsonl(df, f, chunk_rows):
+    for chunk in _chunks(df, chunk_rows):
+        text = chunk.to_json(orient='records', lines=True, force_ascii=False)
+        f.write(text if text.endswith('\n') else text + '\n')
+
+
+def _write_parquet(df, path, chunk_rows):
+    if pq is None:
+        raise RuntimeError("Для записи Parquet требуется пакет pyarrow")
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_new(df, path, fmt, chunk_rows):
+    if fmt == 'parquet':
+        _write_parquet(df, path, chunk_rows)
+    elif fmt == 'csv.gz':
+        with gzip.open(path, 'wt', encoding='utf-8', newline='') as f:
+            _write_csv(df, f, True, chunk_rows)
+    elif fmt == 'jsonl':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            _write_jsonl(df, f, chunk_rows)
+    else:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            _write_csv(df, f, True, chunk_rows)
+
+
+def write_atomic(df, path, fmt=None, chunk_rows=WRITE_CHUNK_ROWS):
+    """Пишет файл во временный файл рядом с целевым и атомарно переименовывает.
+
+    При сбое во время записи целевой файл остается прежним.
+    """
+    fmt = fmt or detect_format(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        _write_new(df, tmp_path, fmt, chunk_rows)
+        # mkstemp создает файл с правами 0600 - сохраняем права прежнего файла
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def append_rows(df, path, fmt=None, chunk_rows=WRITE_CHUNK_ROWS):
+    """Дописывает строки в конец существующего файла.
+
+    CSV, gzip (новым gzip-блоком) и JSONL дописываются на месте, при сбое
+    файл обрезается до исходного размера. Parquet дописать нельзя - он
+    перечитывается и атомарно перезаписывается.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == 'parquet':
+        write_atomic(pd.concat([pd.read_parquet(path), df], ignore_index=True), path, fmt, chunk_rows)
+        return
+
+    original_size = os.path.getsize(path)
+    try:
+        if fmt == 'csv.gz':
+            with gzip.open(path, 'at', encoding='utf-8', newline='') as f:
+                _write_csv(df, f, False, chunk_rows)
+        elif fmt == 'jsonl':
+            with open(path, 'a', encoding='utf-8', newline='') as f:
+                _write_jsonl(df, f, chunk_rows)
+        else:
+            with open(path, 'a', encoding='utf-8', newline='') as f:
+                _write_csv(df, f, False, chunk_rows)
+    except BaseException:
+        with open(path, 'rb+') as f:
+            f.truncate(original_size)
+        raise
+
+
+def read_columns(path, columns):
+    """Читает выбранные столбцы расписания любого поддерживаемого формата"""
+    fmt = detect_format(path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    if fmt == 'jsonl':
+        return pd.read_json(path, lines=True, dtype=False)[columns]
+    return pd.read_csv(path, usecols=columns, compression='gzip' if fmt == 'csv.gz' else None)
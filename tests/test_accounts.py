@@ -0,0 +1,45 @@
+import pandas as pd
+
+from modules.accounts import AccountProfile, plan_accounts
+from modules.engine import PlannerConfig
+
+
+def test_accounts_share_no_slots_and_keep_calendar_rules():
+    df = pd.DataFrame({
+        'image url': [f"https://i.pinimg.com/{i}.jpg" for i in range(90)],
+        'saves': range(90),
+        'created date': ["01.01.2025"] * 90,
+    })
+    config = PlannerConfig(
+        start_date="02.02.2026", start_time="09:00", min_interval=1, max_interval=2, seed=7,
+        posting_windows={'*': '09:00-10:00'}, daily_cap=5
+    )
+    profiles = [AccountProfile(name=f"acc{i}") for i in range(3)]
+
+    schedules = plan_accounts(df, config, profiles, max_workers=1)
+
+    all_dates = []
+    for schedule in schedules.values():
+        dates = pd.to_datetime(schedule['date'], format="%d.%m.%Y %H:%M")
+        assert len(dates) == 30
+        assert dates.dt.hour.eq(9).all()
+        assert dates.dt.date.value_counts().max() <= 5
+        assert dates.sort_values().diff().dropna().min() >= pd.Timedelta(minutes=1)
+        all_dates.extend(dates)
+    assert len(set(all_dates)) == len(all_dates)
+
+
+def test_accounts_never_share_size_variants_of_one_image():
+    df = pd.DataFrame({
+        'image url': ["https://i.pinimg.com/236x/ab/cd/x.jpg", "https://i.pinimg.com/736x/ab/cd/x.jpg"]
+        + [f"https://i.pinimg.com/736x/ab/cd/{i}.jpg" for i in range(10)],
+        'saves': [100, 99] + list(range(10)),
+        'created date': ["01.01.2025"] * 12,
+    })
+    config = PlannerConfig(start_date="02.02.2026", seed=1)
+    profiles = [AccountProfile(name="a"), AccountProfile(name="b")]
+
+    schedules = plan_accounts(df, config, profiles, max_workers=1)
+
+    images = pd.concat([schedule['image1'] for schedule in schedules.values()])
+    assert images.str.endswith("/x.jpg").sum() == 1
@@ -0,0 +1,36 @@
+import asyncio
+
+from modules.ai_batches import BatchRunner
+from modules.key_pool import KeyPool
+
+
+class FakeClient:
+    async def close(self):
+        pass
+
+
+def test_concurrency_caps_workers_regardless_of_key_count():
+    state = {'inflight': 0, 'peak': 0}
+
+    async def request(client, size):
+        state['inflight'] += 1
+        state['peak'] = max(state['peak'], state['inflight'])
+        await asyncio.sleep(0.01)
+        state['inflight'] -= 1
+        return [f"text {i}" for i in range(size)]
+
+    pool = KeyPool(['a', 'b', 'c', 'd'], lambda key: FakeClient(), provider='test-cap')
+    texts = asyncio.run(BatchRunner(request, 20, 2, pool, concurrency=2).run_async())
+
+    assert len(texts) == 20
+    assert state['peak'] == 2
+
+
+def test_jobs_share_key_limiter():
+    first = KeyPool(['k'], lambda key: FakeClient(), 20, 1000, provider='test-share')
+    second = KeyPool(['k'], lambda key: FakeClient(), 30, 1000, provider='test-share')
+    other = KeyPool(['k'], lambda key: FakeClient(), 30, 1000, provider='test-other')
+
+    assert first.limiters['k'] is second.limiters['k']
+    assert first.limiters['k'] is not other.limiters['k']
+    assert first.limiters['k'].requests.capacity == 30
@@ -0,0 +1,69 @@
+import types
+
+import pandas as pd
+
+from modules import ai_generator
+from modules.ai_generator import generate_unique_texts
+from modules.ai_settings import ProviderSettings, TextSettings
+from modules.engine import PlannerConfig
+from modules.jobs import JobQueue
+from modules.planner import PinterestPlanner
+
+
+def test_texts_use_job_snapshot_without_app_variables():
+    # Без AI генератор не должен обращаться к окну: app не нужен
+    settings = TextSettings(text_template="Пост {num}")
+    assert generate_unique_texts(None, settings, "Тема", 3, number_start=7) == ["Пост 7", "Пост 8", "Пост 9"]
+
+
+def test_queue_keeps_ai_snapshot_of_job():
+    seen = []
+    queue = JobQueue(lambda job, q: seen.append(job.ai), max_workers=1)
+    settings = TextSettings(use_cache=False)
+    job = queue.add("in.csv", "out.csv", None, settings)
+    queue._futures[job.job_id].result()
+    queue.shutdown()
+    assert seen == [settings]
+
+
+def test_append_with_cache_does_not_reuse_scheduled_texts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    def fake_generator(app, settings, base_text, count, progress_callback=None, number_start=101,
+                       checkpoint=None, status_callback=None):
+        done = list(checkpoint.texts) if checkpoint is not None else []
+        texts = done + [f"AI {len(calls)}-{i}" for i in range(count - len(done))]
+        calls.append(count - len(done))
+        if checkpoint is not None:
+            checkpoint.save(texts)
+        return texts
+
+    monkeypatch.setitem(ai_generator.GENERATORS, 'openrouter', (fake_generator, "Ошибка OpenRouter"))
+    app = types.SimpleNamespace(
+        run_in_ui=lambda func, *args: func(*args),
+        status_var=types.SimpleNamespace(set=lambda message: None),
+        log_error=print, show_error_with_details=print
+    )
+    planner = PinterestPlanner(app)
+    ai = TextSettings(providers=(ProviderSettings('openrouter', ('key',), 'model', 0.7, 1000, 1, 0, 0),))
+
+    output = tmp_path / "schedule.csv"
+    for name, append in (("first", False), ("second", True)):
+        source = tmp_path / f"{name}.csv"
+        pd.DataFrame({
+            'image url': [f"https://i.pinimg.com/{name}{i}.jpg" for i in range(5)],
+            'saves': range(5),
+            'created date': ["01.01.2025"] * 5,
+        }).to_csv(source, index=False)
+        queue = JobQueue(planner.run_job, max_workers=1)
+        config = PlannerConfig(start_date="01.02.2026", seed=1, append=append, base_link="https://t.me/x")
+        job = queue.add(str(source), str(output), config, ai)
+        queue._futures[job.job_id].result()
+        queue.shutdown()
+        assert job.state == "Готово", job.details
+
+    schedule = pd.read_csv(output)
+    assert len(schedule) == 10
+    assert not schedule['text'].duplicated().any()
+    assert calls == [5, 5]
@@ -0,0 +1,155 @@
+import os
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from modules import cli
+from modules.engine import PlannerConfig, PlannerError, plan, validate_columns
+
+
+def test_planner_error_pickles():
+    error = PlannerError("Ошибка", "Нет столбцов", "Ошибка: отсутствуют столбцы", level="warning")
+    restored = pickle.loads(pickle.dumps(error))
+    assert isinstance(restored, PlannerError)
+    assert (restored.title, restored.message, restored.status, restored.level) == (
+        error.title, error.message, error.status, error.level
+    )
+
+
+def test_planner_error_crosses_process_pool():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(validate_columns, pd.DataFrame({'saves': [1]}))
+        with pytest.raises(PlannerError) as info:
+            future.result()
+    assert info.value.status == "Ошибка: отсутствуют столбцы"
+    assert "image url" in info.value.message
+
+
+def test_cli_bad_file_does_not_fail_batch(tmp_path):
+    good = tmp_path / "ok.csv"
+    bad = tmp_path / "bad.csv"
+    pd.DataFrame({
+        'image url': [f"https://i.pinimg.com/{i}.jpg" for i in range(5)],
+        'saves': range(5),
+        'created date': ["01.01.2025"] * 5,
+    }).to_csv(good, index=False)
+    pd.DataFrame({'image url': ["https://i.pinimg.com/x.jpg"], 'saves': [1]}).to_csv(bad, index=False)
+    out_dir = tmp_path / "out"
+
+    code = cli.main(['plan', str(good), str(bad), '--output-dir', str(out_dir), '--jobs', '2',
+                     '--date', '01.02.2026'])
+
+    assert code == 1
+    assert os.path.exists(out_dir / "ok_schedule.csv")
+    assert len(pd.read_csv(out_dir / "ok_schedule.csv")) == 5
+    assert not os.path.exists(out_dir / "bad_schedule.csv")
+
+
+def test_cli_imports_without_tkinter():
+    # Консольный запуск должен работать на машине без Tk
+    code = "import sys; sys.modules['tkinter'] = None; import modules.cli"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', code], cwd=root, check=True)
+
+
+def test_append_after_repeated_images_keeps_numbering(tmp_path):
+    urls = [f"https://i.pinimg.com/{i}.jpg" for i in range(40)]
+    first = tmp_path / "first.csv"
+    pd.DataFrame({
+        'image url': urls + urls[:5],
+        'saves': list(range(40)) + list(range(5)),
+        'created date': ["01.01.2025"] * 45,
+    }).to_csv(first, index=False)
+    second = tmp_path / "second.csv"
+    pd.DataFrame({
+        'image url': urls + [f"https://i.pinimg.com/new{i}.jpg" for i in range(10)],
+        'saves': range(50),
+        'created date': ["01.01.2025"] * 50,
+    }).to_csv(second, index=False)
+    output = tmp_path / "schedule.csv"
+    common = ['-o', str(output), '--date', '01.02.2026', '--base-link', 'https://t.me/x']
+
+    assert cli.main(['plan', str(first)] + common) == 0
+    assert len(pd.read_csv(output)) == 40
+    assert cli.main(['plan', str(second), '--append'] + common) == 0
+
+    schedule = pd.read_csv(output)
+    assert len(schedule) == 50
+    assert not schedule['link'].duplicated().any()
+    assert not schedule['text'].duplicated().any()
+    assert not schedule['image1'].duplicated().any()
+
+
+def test_append_counts_existing_posts_towards_daily_cap(tmp_path):
+    output = tmp_path / "schedule.csv"
+    common = ['-o', str(output), '--date', '01.02.2026', '--daily-cap', '5']
+    for name, count in (("first", 7), ("second", 10)):
+        path = tmp_path / f"{name}.csv"
+        pd.DataFrame({
+            'image url': [f"https://i.pinimg.com/{name}{i}.jpg" for i in range(count)],
+            'saves': range(count),
+            'created date': ["01.01.2025"] * count,
+        }).to_csv(path, index=False)
+        assert cli.main(['plan', str(path)] + common + (['--append'] if name == "second" else [])) == 0
+
+    per_day = pd.read_csv(output)['date'].str[:10].value_counts()
+    assert len(per_day) == 4
+    assert per_day.max() == 5
+
+
+def test_alias_headers_in_single_and_merged_inputs(tmp_path):
+    df = pd.DataFrame({
+        'Image URL': [f"https://i.pinimg.com/{i}.jpg" for i in range(6)],
+        'Repins': range(6),
+        'Created at': ["01.01.2025"] * 6,
+    })
+    csv_path = tmp_path / "a.csv"
+    xlsx_path = tmp_path / "b.xlsx"
+    df.to_csv(csv_path, index=False)
+    df.assign(**{'Image URL': [f"https://i.pinimg.com/x{i}.jpg" for i in range(6)]}).to_excel(xlsx_path, index=False)
+    common = ['--date', '01.02.2026']
+
+    assert cli.main(['plan', str(csv_path), '-o', str(tmp_path / "single.csv")] + common) == 0
+    assert len(pd.read_csv(tmp_path / "single.csv")) == 6
+    merged = f"{csv_path};{xlsx_path}"
+    assert cli.main(['plan', merged, '-o', str(tmp_path / "merged.csv")] + common) == 0
+    assert len(pd.read_csv(tmp_path / "merged.csv")) == 12
+
+
+@pytest.mark.parametrize('settings', [
+    {'daily_cap': 0.5},
+    {'daily_cap': -1},
+    {'posting_windows': {'9': '09:00-10:00'}},
+])
+def test_invalid_calendar_settings_raise_planner_error(settings):
+    df = pd.DataFrame({
+        'image url': [f"https://i.pinimg.com/{i}.jpg" for i in range(5)],
+        'saves': range(5),
+        'created date': ["01.01.2025"] * 5,
+    })
+    with pytest.raises(PlannerError):
+        plan(df, PlannerConfig(start_date="01.02.2026", **settings))
+
+
+def test_preview_counts_rows_read_before_append_filter(tmp_path):
+    from modules.engine import preview
+    source = tmp_path / "in.csv"
+    pd.DataFrame({
+        'image url': [f"https://i.pinimg.com/{i}.jpg" for i in range(10)],
+        'saves': range(10),
+        'created date': ["01.01.2025"] * 10,
+    }).to_csv(source, index=False)
+    output = tmp_path / "schedule.csv"
+    assert cli.main(['plan', str(source), '-o', str(output), '--date', '01.02.2026', '--post-limit', '4']) == 0
+
+    config = PlannerConfig(start_date="01.02.2026", append=True)
+    result = preview(str(source), config, output_path=str(output))
+    streamed = preview(str(source), PlannerConfig(start_date="01.02.2026", append=True, streaming=True,
+                                                  post_limit=100), output_path=str(output))
+
+    assert result.read_rows == streamed.read_rows == 10
+    assert result.planned_rows == streamed.planned_rows == 6
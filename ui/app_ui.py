@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
-import threading
 import textwrap
 import webbrowser
 import os
@@ -9,13 +8,22 @@ import traceback
 import json
 import platform
 import socket
+import threading
 from datetime import datetime, timedelta
-from config import VERSION, BUILD_DATE, CONTACT, LOGIN_FILE, ALLOWED_FILE, LOG_FILE
+from config import (
+    VERSION, BUILD_DATE, CONTACT, LOGIN_FILE, ALLOWED_FILE, LOG_FILE, MAX_PARALLEL_JOBS,
+    AI_CONCURRENCY, AI_REQUESTS_PER_MINUTE, AI_TOKENS_PER_MINUTE, CHATGPT_REQUESTS_PER_MINUTE,
+    CHATGPT_TOKENS_PER_MINUTE
+)
 from modules.auth import AuthManager
 from modules.key_manager import KeyManager
+from modules.engine import PlannerError, preview
+from modules.jobs import JobQueue
+from modules.merge import INPUT_SEPARATOR, load_sources
 from modules.planner import PinterestPlanner
+from modules.ranking import DEFAULT_SCORER
 from modules.dialogs import LoginDialog, KeyManagementDialog
-from ui.tabs import create_main_tab, create_filters_tab, create_content_tab, create_help_tab
+from ui.tabs import create_main_tab, create_filters_tab, create_content_tab, create_queue_tab, create_help_tab
 
 
 class PinterestPlannerApp:
@@ -30,6 +38,7 @@ class PinterestPlannerApp:
         self.openai_key_manager = KeyManager("openai_keys.json")
         self.openrouter_key_manager = KeyManager("openrouter_keys.json")
         self.planner = PinterestPlanner(self)
+        self.job_queue = JobQueue(self.planner.run_job, MAX_PARALLEL_JOBS, on_update=self.on_job_update)
 
         # Переменные состояния
         self.status_var = tk.StringVar(value="Готов к работе")
@@ -46,6 +55,9 @@ class PinterestPlannerApp:
         self.create_widgets_with_tabs()
         self.create_menu()
 
+        # Незапущенные задания отменяются при закрытии окна
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Проверка авторизации при запуске
         self.check_auth_on_startup()
 
@@ -62,6 +74,10 @@ class PinterestPlannerApp:
         self.max_interval_var = tk.StringVar(value="50")
         self.input_file_var = tk.StringVar(value="final_merged.xlsx")
         self.output_file_var = tk.StringVar(value="content_schedule.csv")
+        self.append_var = tk.BooleanVar(value=False)
+        self.posting_windows_var = tk.StringVar()
+        self.daily_cap_var = tk.StringVar()
+        self.blackout_dates_var = tk.StringVar()
 
         # Фильтры
         self.enable_post_limit = tk.BooleanVar(value=False)
@@ -69,6 +85,9 @@ class PinterestPlannerApp:
         self.enable_min_saves = tk.BooleanVar(value=False)
         self.min_saves_var = tk.StringVar(value="200")
         self.sort_by_saves_only = tk.BooleanVar(value=False)
+        self.ranking_var = tk.StringVar(value=DEFAULT_SCORER)
+        self.streaming_var = tk.BooleanVar(value=False)
+        self.skip_posted_var = tk.BooleanVar(value=True)
 
         # Контент
         self.base_text_var = tk.StringVar()
@@ -84,6 +103,10 @@ class PinterestPlannerApp:
         self.ai_model_var = tk.StringVar(value="gpt-3.5-turbo")
         self.ai_temperature_var = tk.DoubleVar(value=0.7)
         self.ai_max_tokens_var = tk.IntVar(value=100)
+        self.ai_concurrency_var = tk.IntVar(value=AI_CONCURRENCY)
+        self.ai_rpm_var = tk.IntVar(value=CHATGPT_REQUESTS_PER_MINUTE)
+        self.ai_tpm_var = tk.IntVar(value=CHATGPT_TOKENS_PER_MINUTE)
+        self.ai_cache_var = tk.BooleanVar(value=True)
 
         # OpenRouter настройки
         self.openrouter_key_var = tk.StringVar()
@@ -93,6 +116,9 @@ class PinterestPlannerApp:
         self.openrouter_temperature_var = tk.DoubleVar(value=0.7)
         self.openrouter_max_tokens_var = tk.IntVar(value=1000)
         self.openrouter_delay_var = tk.DoubleVar(value=5.0)
+        self.openrouter_concurrency_var = tk.IntVar(value=AI_CONCURRENCY)
+        self.openrouter_rpm_var = tk.IntVar(value=AI_REQUESTS_PER_MINUTE)
+        self.openrouter_tpm_var = tk.IntVar(value=AI_TOKENS_PER_MINUTE)
 
         # Загрузка сохраненных ключей
         self.load_saved_keys()
@@ -138,6 +164,14 @@ class PinterestPlannerApp:
         )
         run_button.pack(side=tk.RIGHT, padx=5, ipadx=10, ipady=5)
 
+        # Кнопка предпросмотра
+        preview_button = ttk.Button(
+            button_frame,
+            text="Предпросмотр",
+            command=self.run_preview
+        )
+        preview_button.pack(side=tk.RIGHT, padx=5, ipadx=10, ipady=5)
+
         # Панель статуса
         status_frame = ttk.Frame(button_frame)
         status_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
@@ -182,6 +216,10 @@ class PinterestPlannerApp:
         notebook.add(content_tab, text="Контент")
         create_content_tab(content_tab, self)
 
+        queue_tab = ttk.Frame(notebook, padding=10)
+        notebook.add(queue_tab, text="Очередь")
+        create_queue_tab(queue_tab, self)
+
         help_tab = ttk.Frame(notebook, padding=10)
         notebook.add(help_tab, text="Помощь")
         create_help_tab(help_tab, self)
@@ -194,7 +232,7 @@ class PinterestPlannerApp:
         file_menu = tk.Menu(self.menubar, tearoff=0)
         file_menu.add_command(label="Открыть CSV", command=self.open_csv_editor)
         file_menu.add_separator()
-        file_menu.add_command(label="Выход", command=self.root.quit)
+        file_menu.add_command(label="Выход", command=self.on_close)
         self.menubar.add_cascade(label="Файл", menu=file_menu)
 
         # Меню Отчеты
@@ -412,18 +450,24 @@ class PinterestPlannerApp:
         webbrowser.open(f"https://t.me/{self.contact[1:]}")
 
     def browse_input_file(self):
-        """Выбор входного файла"""
-        file_path = filedialog.askopenfilename(
-            filetypes=[("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+        """Выбор входных файлов: несколько выгрузок объединяются перед планированием"""
+        file_paths = filedialog.askopenfilenames(
+            filetypes=[("Excel/CSV files", "*.xlsx *.xls *.csv"), ("All files", "*.*")]
         )
-        if file_path:
-            self.input_file_var.set(file_path)
+        if file_paths:
+            self.input_file_var.set(f"{INPUT_SEPARATOR} ".join(file_paths))
 
     def browse_output_file(self):
         """Выбор файла для сохранения"""
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[
+                ("CSV files", "*.csv"),
+                ("CSV gzip", "*.csv.gz"),
+                ("Parquet", "*.parquet"),
+                ("JSON Lines", "*.jsonl"),
+                ("All files", "*.*")
+            ]
         )
         if file_path:
             self.output_file_var.set(file_path)
@@ -437,10 +481,108 @@ class PinterestPlannerApp:
             )
             return
 
-        self.status_var.set("Генерация запущена...")
-        self.progress_bar.pack(side=tk.RIGHT, padx=5)
-        self.progress_var.set(0)
-        threading.Thread(target=self.planner.run_planner).start()
+        try:
+            config = self.planner.build_config()
+            ai = self.planner.build_ai_settings()
+        except Exception as e:
+            self.log_error(e)
+            self.show_error_with_details(e)
+            return
+
+        input_path = self.input_file_var.get()
+        output_path = self.output_file_var.get()
+        if os.path.abspath(output_path) in self.job_queue.active_outputs():
+            messagebox.showwarning(
+                "Файл занят",
+                f"В файл {output_path} уже пишет задание из очереди.\nВыберите другой файл для сохранения."
+            )
+            return
+
+        job = self.job_queue.add(input_path, output_path, config, ai)
+        self.status_var.set(f"Задание {job.job_id} добавлено в очередь")
+
+    def run_preview(self):
+        """Быстрый предпросмотр расписания по текущим настройкам (без AI и записи)"""
+        if not self.auth.current_user:
+            messagebox.showwarning(
+                "Требуется авторизация",
+                "Пожалуйста, авторизуйтесь для использования приложения"
+            )
+            return
+
+        try:
+            config = self.planner.build_config()
+        except Exception as e:
+            self.log_error(e)
+            self.show_error_with_details(e)
+            return
+
+        input_path = self.input_file_var.get()
+        output_path = self.output_file_var.get()
+        self.status_var.set("Предпросмотр...")
+
+        def worker():
+            try:
+                result = preview(load_sources(input_path), config, output_path=output_path)
+            except PlannerError as e:
+                self.run_in_ui(self.show_preview_error, e)
+                return
+            except Exception as e:
+                self.run_in_ui(self.log_error, e)
+                self.run_in_ui(self.show_error_with_details, e)
+                self.run_in_ui(self.status_var.set, "Ошибка предпросмотра")
+                return
+            self.run_in_ui(self.show_preview, result)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_preview_error(self, error):
+        self.status_var.set(error.status)
+        show = messagebox.showwarning if error.level == "warning" else messagebox.showerror
+        show(error.title, error.message)
+
+    def show_preview(self, result):
+        """Окно с первыми строками расписания и итогами"""
+        self.status_var.set("Предпросмотр готов")
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Предпросмотр расписания")
+        dialog.geometry("800x500")
+        dialog.transient(self.root)
+
+        main_frame = ttk.Frame(dialog, padding=15)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        read = f" из {result.read_rows}" if result.read_rows is not None else ""
+        ttk.Label(
+            main_frame,
+            text=f"Прошло фильтры: {result.planned_rows}{read} строк\n"
+                 f"Расписание: с {result.start:%d.%m.%Y %H:%M} по {result.end:%d.%m.%Y %H:%M}",
+            font=("Arial", 10, "bold")
+        ).pack(anchor=tk.W, pady=(0, 10))
+
+        table_frame = ttk.Frame(main_frame)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        columns = list(result.rows.columns)
+        tree = ttk.Treeview(table_frame, columns=columns, show="headings")
+        widths = {'date': 120, 'text': 200, 'link': 200, 'image1': 260}
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=widths.get(column, 150), anchor=tk.W)
+        for row in result.rows.itertuples(index=False):
+            tree.insert("", tk.END, values=list(row))
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+
+        ttk.Label(
+            main_frame,
+            text=f"Показаны первые {len(result.rows)} строк. Тексты - заглушки по шаблону, AI не вызывался.",
+            font=("Arial", 9),
+            foreground="gray"
+        ).pack(anchor=tk.W, pady=(10, 5))
+        ttk.Button(main_frame, text="Закрыть", command=dialog.destroy).pack(anchor=tk.E)
 
     def open_csv_editor(self):
         """Открытие редактора CSV/Excel файлов"""
@@ -458,16 +600,85 @@ class PinterestPlannerApp:
             from modules.csv_editor import CSVEditor
             CSVEditor(self.root, file_path)
 
-    def update_progress_bar(self, progress, current, total):
-        """Обновление прогресс-бара и статуса"""
-        self.progress_var.set(progress)
-        self.status_var.set(f"Генерация текстов: {current}/{total} ({progress:.1f}%)")
+    def run_in_ui(self, func, *args):
+        """Выполняет func в потоке интерфейса.
+
+        Tk не потокобезопасен: задания и генерация текстов работают в своих
+        потоках и обращаются к окнам, переменным-строкам и диалогам только
+        через этот метод.
+        """
+        if threading.current_thread() is threading.main_thread():
+            func(*args)
+            return
+        try:
+            self.root.after(0, func, *args)
+        except (RuntimeError, tk.TclError):
+            # Окно уже закрыто, задание дорабатывает в фоне
+            pass
+
+    def on_job_update(self, job):
+        """Вызывается из потоков заданий - обновление переносится в поток интерфейса"""
+        self.run_in_ui(self.refresh_job_row, job)
+
+    def refresh_job_row(self, job):
+        """Обновляет строку задания и общий прогресс-бар"""
+        values = (
+            job.input_name,
+            os.path.basename(job.output_path),
+            job.state,
+            f"{job.progress:.0f}%",
+            job.message
+        )
+        row_id = str(job.job_id)
+        if self.jobs_tree.exists(row_id):
+            self.jobs_tree.item(row_id, values=values)
+        elif self.job_queue.get(job.job_id) is not None:
+            self.jobs_tree.insert("", tk.END, iid=row_id, values=values)
+        self.update_queue_progress()
+
+    def update_queue_progress(self):
+        """Общий прогресс-бар: средний прогресс незавершенных заданий"""
+        active = [job for job in self.job_queue.jobs if not job.finished]
+        if not active:
+            self.hide_progress()
+            return
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        self.progress_var.set(sum(job.progress for job in active) / len(active))
 
     def hide_progress(self):
         """Скрытие прогресс-бара"""
         self.progress_bar.pack_forget()
         self.progress_var.set(0)
 
+    def selected_job(self):
+        selection = self.jobs_tree.selection()
+        return self.job_queue.get(int(selection[0])) if selection else None
+
+    def show_job_details(self):
+        """Показывает итог выбранного задания: замеры этапов или текст ошибки"""
+        job = self.selected_job()
+        if job is None:
+            return
+        details = job.details or job.message or job.state
+        messagebox.showinfo(f"Задание {job.job_id}", f"{job.input_path} -> {job.output_path}\n\n{details}")
+
+    def cancel_selected_job(self):
+        """Отменяет выбранное задание, если оно еще не запущено"""
+        job = self.selected_job()
+        if job is not None and not self.job_queue.cancel(job.job_id):
+            messagebox.showinfo("Очередь", "Отменить можно только задание, которое ждет в очереди")
+
+    def clear_finished_jobs(self):
+        """Убирает завершенные задания из списка"""
+        for job_id in self.job_queue.clear_finished():
+            if self.jobs_tree.exists(str(job_id)):
+                self.jobs_tree.delete(str(job_id))
+
+    def on_close(self):
+        """Закрытие приложения: ожидающие задания отменяются"""
+        self.job_queue.shutdown()
+        self.root.destroy()
+
     def test_api_connection(self):
         """Проверка подключения к OpenAI API"""
         api_key = self.api_key_var.get()
@@ -717,7 +928,8 @@ class PinterestPlannerApp:
             "hostname": socket.gethostname(),
             "error_type": type(exception).__name__,
             "error_message": str(exception),
-            "traceback": traceback.format_exc(),
+            # Трассировка из самого исключения: журнал пишется и из after() после ошибки в потоке
+            "traceback": "".join(traceback.format_exception(exception)),
             "input_file": self.input_file_var.get(),
             "output_file": self.output_file_var.get(),
             "date": self.date_var.get(),
@@ -810,7 +1022,7 @@ class PinterestPlannerApp:
             height=10
         )
         trace_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        trace_text.insert(tk.INSERT, traceback.format_exc())
+        trace_text.insert(tk.INSERT, "".join(traceback.format_exception(exception)))
         trace_text.configure(state=tk.DISABLED)
 
         # Кнопки
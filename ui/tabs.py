@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import textwrap
+from modules.ranking import SCORERS
 from modules.utils import bind_paste_shortcut, format_date_input, format_time_input, toggle_advanced_settings, toggle_openrouter_settings, toggle_ai_settings, toggle_entry_state, correct_delay_value, update_openai_keys, update_openrouter_keys
 
 def create_main_tab(parent, app):
@@ -8,10 +9,10 @@ def create_main_tab(parent, app):
     source_frame = ttk.LabelFrame(parent, text="Источник данных")
     source_frame.pack(fill=tk.X, pady=5, padx=5)
 
-    # Поле для файла Excel
+    # Поле для файлов выгрузок (несколько - через точку с запятой)
     file_row = ttk.Frame(source_frame)
     file_row.pack(fill=tk.X, pady=5, padx=5)
-    ttk.Label(file_row, text="Файл Excel:").pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Label(file_row, text="Файлы выгрузок:").pack(side=tk.LEFT, padx=(0, 5))
     file_entry = ttk.Entry(file_row, textvariable=app.input_file_var, width=70)
     file_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
     bind_paste_shortcut(file_entry)
@@ -26,6 +27,15 @@ def create_main_tab(parent, app):
     bind_paste_shortcut(save_entry)
     ttk.Button(save_row, text="Обзор", command=app.browse_output_file, width=10).pack(side=tk.LEFT)
 
+    # Дописывание в существующее расписание
+    append_row = ttk.Frame(source_frame)
+    append_row.pack(fill=tk.X, pady=5, padx=5)
+    ttk.Checkbutton(
+        append_row,
+        text="Дописать в существующее расписание (продолжить время и нумерацию, пропустить запланированные пины)",
+        variable=app.append_var
+    ).pack(anchor=tk.W)
+
     # Информация о требуемых колонках
     ttk.Label(
         source_frame,
@@ -66,6 +76,33 @@ def create_main_tab(parent, app):
     max_entry.pack(side=tk.LEFT)
     bind_paste_shortcut(max_entry)
 
+    # Окна публикаций и лимит в день
+    windows_row = ttk.Frame(schedule_frame)
+    windows_row.pack(fill=tk.X, pady=5, padx=5)
+    ttk.Label(windows_row, text="Окна публикаций:").pack(side=tk.LEFT, padx=(0, 5))
+    windows_entry = ttk.Entry(windows_row, textvariable=app.posting_windows_var, width=30)
+    windows_entry.pack(side=tk.LEFT, padx=(0, 15))
+    bind_paste_shortcut(windows_entry)
+
+    ttk.Label(windows_row, text="Макс. постов в день:").pack(side=tk.LEFT, padx=(0, 5))
+    daily_cap_entry = ttk.Entry(windows_row, textvariable=app.daily_cap_var, width=10)
+    daily_cap_entry.pack(side=tk.LEFT)
+    bind_paste_shortcut(daily_cap_entry)
+
+    blackout_row = ttk.Frame(schedule_frame)
+    blackout_row.pack(fill=tk.X, pady=5, padx=5)
+    ttk.Label(blackout_row, text="Даты без публикаций:").pack(side=tk.LEFT, padx=(0, 5))
+    blackout_entry = ttk.Entry(blackout_row, textvariable=app.blackout_dates_var, width=50)
+    blackout_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    bind_paste_shortcut(blackout_entry)
+
+    ttk.Label(
+        schedule_frame,
+        text="Окна: 09:00-12:00, 18:00-22:00 (пусто - круглосуточно). Даты: ДД.ММ.ГГГГ через запятую",
+        font=("Arial", 9),
+        foreground="gray"
+    ).pack(pady=(0, 5), anchor=tk.W, padx=10)
+
 def create_filters_tab(parent, app):
     """Создает вкладку 'Фильтры'"""
     filters_frame = ttk.LabelFrame(parent, text="Фильтры контента")
@@ -111,6 +148,41 @@ def create_filters_tab(parent, app):
     )
     sort_cb.pack(anchor=tk.W)
 
+    # Формула ранжирования
+    ranking_frame = ttk.Frame(filters_frame)
+    ranking_frame.pack(fill=tk.X, pady=10, padx=10)
+    ttk.Label(ranking_frame, text="Формула ранжирования:").pack(side=tk.LEFT, padx=(0, 10))
+    ranking_combo = ttk.Combobox(ranking_frame, textvariable=app.ranking_var, width=20, state="readonly")
+    ranking_combo['values'] = tuple(SCORERS)
+    ranking_combo.pack(side=tk.LEFT)
+    ttk.Label(
+        filters_frame,
+        text="weight - сохранения в день, half_life - затухание за 30 дней, "
+             "log_saves - логарифм сохранений, recency - бонус свежим пинам",
+        font=("Arial", 9),
+        foreground="gray"
+    ).pack(anchor=tk.W, padx=10)
+
+    # История публикаций
+    posted_frame = ttk.Frame(filters_frame)
+    posted_frame.pack(fill=tk.X, pady=10, padx=10)
+    posted_cb = ttk.Checkbutton(
+        posted_frame,
+        text="Пропускать пины, уже запланированные в прошлых расписаниях",
+        variable=app.skip_posted_var
+    )
+    posted_cb.pack(anchor=tk.W)
+
+    # Потоковое чтение больших CSV
+    streaming_frame = ttk.Frame(filters_frame)
+    streaming_frame.pack(fill=tk.X, pady=10, padx=10)
+    streaming_cb = ttk.Checkbutton(
+        streaming_frame,
+        text="Потоковое чтение больших CSV (при включенном лимите или фильтре сохранений)",
+        variable=app.streaming_var
+    )
+    streaming_cb.pack(anchor=tk.W)
+
 def create_content_tab(parent, app):
     """Создает вкладку 'Контент'"""
     content_frame = ttk.LabelFrame(parent, text="Настройки контента")
@@ -142,6 +214,15 @@ def create_content_tab(parent, app):
     )
     shuffle_cb.pack(anchor=tk.W)
 
+    # Кэш текстов AI
+    cache_row = ttk.Frame(content_frame)
+    cache_row.pack(fill=tk.X, pady=5, padx=5)
+    ttk.Checkbutton(
+        cache_row,
+        text="Брать тексты AI из кэша (повторная тема не требует новых запросов)",
+        variable=app.ai_cache_var
+    ).pack(anchor=tk.W)
+
     # Расширенные настройки
     advanced_frame = ttk.LabelFrame(content_frame, text="Расширенные настройки")
     advanced_frame.pack(fill=tk.X, pady=10, padx=5)
@@ -250,12 +331,25 @@ def create_content_tab(parent, app):
     # Задержка между запросами
     delay_frame = ttk.Frame(openrouter_settings_frame)
     delay_frame.pack(fill=tk.X, padx=5, pady=5)
-    ttk.Label(delay_frame, text="Задержка между запросами (сек, мин. 5):").pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Label(delay_frame, text="Задержка между запросами (сек, мин. 5, при 1 потоке):").pack(side=tk.LEFT, padx=(0, 5))
     delay_entry = ttk.Entry(delay_frame, textvariable=app.openrouter_delay_var, width=10)
     delay_entry.pack(side=tk.LEFT)
     bind_paste_shortcut(delay_entry)
     delay_entry.bind("<FocusOut>", lambda e: correct_delay_value(app.openrouter_delay_var))
 
+    # Параллельные запросы и лимиты провайдера
+    limits_frame = ttk.Frame(openrouter_settings_frame)
+    limits_frame.pack(fill=tk.X, padx=5, pady=5)
+    ttk.Label(limits_frame, text="Потоков:").pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Spinbox(limits_frame, from_=1, to=32, textvariable=app.openrouter_concurrency_var, width=5).pack(
+        side=tk.LEFT, padx=(0, 15))
+    ttk.Label(limits_frame, text="Запросов/мин:").pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Spinbox(limits_frame, from_=0, to=10000, textvariable=app.openrouter_rpm_var, width=7).pack(
+        side=tk.LEFT, padx=(0, 15))
+    ttk.Label(limits_frame, text="Токенов/мин (0 - без лимита):").pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Spinbox(limits_frame, from_=0, to=10000000, increment=1000, textvariable=app.openrouter_tpm_var,
+                width=10).pack(side=tk.LEFT)
+
     # Информация о Cypher Alpha
     info_frame = ttk.Frame(openrouter_settings_frame)
     info_frame.pack(fill=tk.X, pady=5)
@@ -325,6 +419,64 @@ def create_content_tab(parent, app):
     tokens_spin = ttk.Spinbox(tokens_frame, from_=50, to=1000, textvariable=app.ai_max_tokens_var, width=10)
     tokens_spin.pack(fill=tk.X)
 
+    # Параллельные запросы и лимиты OpenAI
+    limits_frame = ttk.Frame(ai_settings_frame)
+    limits_frame.pack(fill=tk.X, padx=5, pady=5)
+    ttk.Label(limits_frame, text="Потоков:").pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Spinbox(limits_frame, from_=1, to=32, textvariable=app.ai_concurrency_var, width=5).pack(
+        side=tk.LEFT, padx=(0, 15))
+    ttk.Label(limits_frame, text="Запросов/мин:").pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Spinbox(limits_frame, from_=0, to=100000, textvariable=app.ai_rpm_var, width=7).pack(
+        side=tk.LEFT, padx=(0, 15))
+    ttk.Label(limits_frame, text="Токенов/мин (0 - без лимита):").pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Spinbox(limits_frame, from_=0, to=100000000, increment=1000, textvariable=app.ai_tpm_var,
+                width=10).pack(side=tk.LEFT)
+    ttk.Label(
+        ai_settings_frame,
+        text="Тексты запрашиваются пакетами: в один ответ помещается столько вариантов, сколько позволяет лимит токенов.",
+        font=("Arial", 9),
+        foreground="gray"
+    ).pack(anchor=tk.W, padx=5)
+
+def create_queue_tab(parent, app):
+    """Создает вкладку 'Очередь' со строкой прогресса на каждое задание"""
+    queue_frame = ttk.LabelFrame(parent, text="Задания")
+    queue_frame.pack(fill=tk.BOTH, expand=True, pady=5, padx=5)
+
+    columns = ("input", "output", "state", "progress", "message")
+    tree = ttk.Treeview(queue_frame, columns=columns, show="headings", selectmode="browse")
+    headings = {
+        "input": ("Файл", 180),
+        "output": ("Результат", 180),
+        "state": ("Состояние", 100),
+        "progress": ("Прогресс", 80),
+        "message": ("Этап", 300),
+    }
+    for column, (title, width) in headings.items():
+        tree.heading(column, text=title)
+        tree.column(column, width=width, anchor=tk.W)
+    scrollbar = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=tree.yview)
+    tree.configure(yscrollcommand=scrollbar.set)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0), pady=5)
+    scrollbar.pack(side=tk.LEFT, fill=tk.Y, pady=5)
+    tree.bind("<Double-1>", lambda e: app.show_job_details())
+    app.jobs_tree = tree
+
+    button_row = ttk.Frame(parent)
+    button_row.pack(fill=tk.X, pady=5, padx=5)
+    ttk.Button(button_row, text="Подробнее", command=app.show_job_details).pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Button(button_row, text="Отменить", command=app.cancel_selected_job).pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Button(button_row, text="Убрать завершенные", command=app.clear_finished_jobs).pack(side=tk.LEFT)
+
+    ttk.Label(
+        parent,
+        text=f"Кнопка \"Сгенерировать файл\" добавляет задание с текущими настройками. "
+             f"Одновременно выполняется заданий: {app.job_queue.max_workers}",
+        font=("Arial", 9),
+        foreground="gray"
+    ).pack(pady=(0, 5), anchor=tk.W, padx=10)
+
+
 def create_help_tab(parent, app):
     """Создает вкладку 'Помощь'"""
     help_frame = ttk.LabelFrame(parent, text="Инструкция по использованию")
@@ -355,6 +507,9 @@ def create_help_tab(parent, app):
          * image url (ссылка на изображение)
          * created date (дата создания пина)
          * saves (количество сохранений)
+       - Можно выбрать сразу несколько выгрузок CSV/Excel (через ";"):
+         они объединятся без повторов изображений (остается запись
+         с наибольшим saves), сводить их вручную в Excel не нужно
        - Поддерживаются различные форматы дат
        - Сохранения должны быть числовым значением
 
@@ -368,6 +523,8 @@ def create_help_tab(parent, app):
        - На вкладке "Контент" укажите:
          * Базовый текст - тема для генерации заголовков
          * Telegram ссылку
+       - "Предпросмотр" быстро покажет первые строки, число строк
+         и даты расписания без обращений к AI
        - Нажмите "Сгенерировать файл"
        - Импортируйте полученный CSV в SMMBox
 
@@ -376,9 +533,16 @@ def create_help_tab(parent, app):
          * Включите опцию "Использовать OpenRouter"
          * Выберите или добавьте API ключ OpenRouter
          * Настройте параметры генерации: модель, температура, токены
+         * Размер пакета подбирается сам: растет при полных и быстрых
+           ответах, уменьшается при обрезанных или медленных и
+           запоминается для каждой модели
+       - Все сохраненные ключи используются вместе: запросы идут по кругу,
+         ключ, упершийся в лимит, временно пропускается
        - ChatGPT (требуется API ключ OpenAI):
          * Выберите или добавьте API ключ OpenAI
          * Настройте параметры модели
+         * Тексты запрашиваются пакетами по лимиту токенов, параллельно
+           на всех ключах OpenAI - текст получает каждая строка плана
 
     💡 Советы по генерации текстов:
        - Базовый текст используется как тема для генерации заголовков